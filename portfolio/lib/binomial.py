@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import math
+import numpy as np
 
 '''
 Module Description:
@@ -15,22 +16,32 @@ def m_order(S, U, D, N, X):
 	C. Wibisono
 	05/19 '25
 	Function Argument(s):
-	S: (float) the risky security price at time 0
-	U: (float) the rate of return if the risky security price goes up
-	D: (float) the rate of return if the risky security price goes down
+	S: (float or array) the risky security price at time 0
+	U: (float or array) the rate of return if the risky security price goes up
+	D: (float or array) the rate of return if the risky security price goes down
 	N: (int) the number of time step where the option is to be exercised
-	X: (float) the strike price of an option
+	X: (float or array) the strike price of an option
 	Return:
-	m: (int) the order before the value exceeds the strike price
+	m: (int or array of int) the least number of up moves for which S(1+U)^m(1+D)^(N-m) exceeds the strike price,
+	N+1 if the price never exceeds the strike price
 	'''
-	
-	k = 0
-	while(1):
-		temp = S*(math.pow(1+U,k))*(math.pow(1+D,N-k))
-		if temp > X:
-			return k
-		else:
-			k = k + 1
+
+	S, U, D, X = [np.asarray(v, dtype=np.float64) for v in (S, U, D, X)]
+	if np.any(U <= D):
+		raise ValueError("the rate of return U must be greater than D")
+
+	#S(1+U)^k(1+D)^(N-k) > X  <=>  k > (log(X/S) - N log(1+D))/(log(1+U) - log(1+D))
+	logu = np.log1p(U)
+	logd = np.log1p(D)
+	z = (np.log(X/S) - N*logd)/(logu - logd)
+	m = np.clip(np.floor(z) + 1, 0, N+1).astype(np.int64)
+
+	#Correct the rounding of the logarithms against the direct comparison:
+	price = lambda k: S*np.power(1.+U, k)*np.power(1.+D, N-k)
+	m = np.where((m > 0) & (price(m-1) > X), m-1, m)
+	m = np.where((m <= N) & (price(m) <= X), m+1, m)
+
+	return m[()]
 	
 
 def p_star(R, U, D):
@@ -92,6 +103,89 @@ def put_payoff(S, X):
 	return val
 
 
+_lgamma = np.vectorize(math.lgamma, otypes=[np.float64])
+
+def _betainc(a, b, x):
+	'''
+	Regularized incomplete beta function I_x(a,b) evaluated with the continued fraction (modified Lentz method).
+	Function Argument(s):
+	a, b: (array) positive parameters
+	x: (array) the argument in [0, 1]
+	Return:
+	val: (array) I_x(a,b)
+	val_c: (array) 1 - I_x(a,b), the smaller of the two is evaluated directly to keep its relative precision
+	'''
+
+	a, b, x = np.broadcast_arrays(*[np.asarray(v, dtype=np.float64) for v in (a, b, x)])
+
+	#The continued fraction converges quickly for x < (a+1)/(a+b+2), use the symmetry relation otherwise:
+	swap = x >= (a+1.)/(a+b+2.)
+	aa = np.where(swap, b, a)
+	bb = np.where(swap, a, b)
+	xx = np.clip(np.where(swap, 1.-x, x), 0., 1.)
+
+	tiny = 1e-300
+	qab = aa + bb
+	qap = aa + 1.
+	qam = aa - 1.
+	c = np.ones_like(xx)
+	d = 1. - qab*xx/qap
+	d = 1./np.where(np.abs(d) < tiny, tiny, d)
+	h = d.copy()
+	for m in range(1, 100000):
+		m2 = 2*m
+		num = m*(bb - m)*xx/((qam + m2)*(aa + m2))
+		d = 1. + num*d
+		d = 1./np.where(np.abs(d) < tiny, tiny, d)
+		c = 1. + num/c
+		c = np.where(np.abs(c) < tiny, tiny, c)
+		h = h*d*c
+		num = -(aa + m)*(qab + m)*xx/((aa + m2)*(qap + m2))
+		d = 1. + num*d
+		d = 1./np.where(np.abs(d) < tiny, tiny, d)
+		c = 1. + num/c
+		c = np.where(np.abs(c) < tiny, tiny, c)
+		delta = d*c
+		h = h*delta
+		if np.all(np.abs(delta - 1.) < 1e-15):
+			break
+
+	with np.errstate(divide='ignore'):
+		lnfront = aa*np.log(xx) + bb*np.log1p(-xx) - (_lgamma(aa) + _lgamma(bb) - _lgamma(aa + bb))
+	direct = np.where(xx > 0., np.exp(lnfront)*h/aa, 0.)
+
+	val = np.where(swap, 1. - direct, direct)
+	val_c = np.where(swap, direct, 1. - direct)
+	return val, val_c
+
+
+def cbd_tail(m, N, p):
+	'''
+	Compute the lower and upper tails of the binomial distribution with N trials and probability of success p,
+	P(K <= m) and P(K > m), from the regularized incomplete beta function P(K <= m) = I_(1-p)(N-m, m+1).
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	m: (int or array) the index to count satisfying a condition for binomial model of an option pricing
+	N: (int) the number of trial (time-step)
+	p: (float or array) the probability of success for each trial
+	Return:
+	low: (float or array) the cumulative binomial distribution P(K <= m)
+	up: (float or array) the complementary distribution P(K > m)
+	'''
+
+	m, p = np.broadcast_arrays(np.asarray(m, dtype=np.float64), np.asarray(p, dtype=np.float64))
+	inside = (m >= 0) & (m < N)
+
+	#Evaluate the interior indices only, the tails are exactly 0 or 1 outside:
+	m_in = np.where(inside, m, 0.)
+	up, low = _betainc(m_in + 1., N - m_in, p)
+	low = np.where(inside, low, np.where(m < 0, 0., 1.))
+	up = np.where(inside, up, np.where(m < 0, 1., 0.))
+
+	return low[()], up[()]
+
+
 def cbd(m, N, p):
 	'''
 	Compute the cumulative binomial distribution with N trials
@@ -99,21 +193,44 @@ def cbd(m, N, p):
 	C. Wibisono
 	05/19 '25
 	Function Argument(s):
-	m: (int) the index to count satisfying a condition for binomial model of an option pricing
+	m: (int or array) the index to count satisfying a condition for binomial model of an option pricing
 	N: (int) the number of trial (time-step)
-	p: (float) the probability of success for each trial
+	p: (float or array) the probability of success for each trial
 	Return:
-	val: (float) the cumulative binomial distribution
+	val: (float or array) the cumulative binomial distribution
 	'''
 	
-	val = 0
-	for k in range(m+1):
-		temp = (math.comb(N,k))*(math.pow(p,k))*(math.pow(1-p,N-k))
-		val = val + temp
-
+	val, val_c = cbd_tail(m, N, p)
 	return val
 
 
+def binom_pmf(N, p):
+	'''
+	Compute the binomial distribution with N trials with probability of success p for a given trial,
+	evaluated in log-space so that it holds for large N.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	N: (int) the number of trial (time-step)
+	p: (float or array) the probability of success for each trial
+	Return:
+	prob: (array) the probability of k = 0, ..., N successes along the last axis, shape p.shape + (N+1,)
+	'''
+
+	p = np.asarray(p, dtype=np.float64)[..., None]
+	k = np.arange(N+1)
+
+	#log C(N,k) = sum_{j=1}^{k} log((N-j+1)/j):
+	j = np.arange(1, N+1)
+	lcomb = np.concatenate(([0.], np.cumsum(np.log(N - j + 1.) - np.log(j))))
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		lprob = lcomb + np.where(k > 0, k*np.log(p), 0.) + np.where(k < N, (N - k)*np.log1p(-p), 0.)
+	prob = np.exp(lprob)
+
+	return prob
+
+
 class TreeNode:
 	'''
 	Create a tree object. This data structure is used to create
@@ -134,42 +251,294 @@ class TreeNode:
 		self.children.append(child)
 
 
-def risky_security_binom_price(N, S_0, U, D):
+class Lattice:
 	'''
-	Compute the risky security prices up to expiry time N to be used in conjunction with the American Option.
+	Create a recombining lattice object. Within the binomial model an up move followed by a down move
+	leads to the same risky security price as a down move followed by an up move, hence time step i
+	only has i+1 distinct nodes instead of 2^i.
+	All nodes are stored in one contiguous float64 array (data); time step i occupies
+	data[i(i+1)/2 : (i+1)(i+2)/2] and the node k within a time step counts the number of down moves
+	(k = 0 is the highest risky security price).
+	The children of node k at time step i are node k (up) and node k+1 (down) at time step i+1.
+	'''
+
+	def __init__(self, N, data=None):
+		'''
+		Instantiate a lattice with expiry time N (N+1 time steps, (N+1)(N+2)/2 nodes)
+		'''
+		self.N = N
+		size = (N+1)*(N+2)//2
+		if data is None:
+			self.data = np.zeros(size)
+		else:
+			self.data = np.ascontiguousarray(data, dtype=np.float64)
+			if self.data.shape != (size,):
+				raise ValueError("lattice with expiry time "+str(N)+" requires "+str(size)+" nodes")
+
+	def level(self, i):
+		'''
+		Return the nodes at time step i as a view on the lattice array
+		'''
+		low = i*(i+1)//2
+		return self.data[low:low+i+1]
+
+	def nodes(self, i, a, b):
+		'''
+		Return the nodes a to b-1 at time step i as a view on the lattice array
+		'''
+		low = i*(i+1)//2
+		return self.data[low+a:low+b]
+
+	def index(self, i, k):
+		'''
+		Return the position of node k at time step i within the lattice array
+		'''
+		return i*(i+1)//2 + k
+
+	def children(self):
+		'''
+		Return the positions of the up and down children for every node before the expiry time.
+		The node at position j of time step i has its children at positions j+i+1 (up) and j+i+2 (down).
+		'''
+		level = np.repeat(np.arange(self.N), np.arange(1, self.N+1))
+		up = np.arange(len(level)) + level + 1
+		return up, up + 1
+
+
+class BandLattice:
+	'''
+	Create a lattice object which only stores the nodes lo[i] to hi[i] of each time step i, e.g. the band of nodes
+	kept by a pruned backward induction. The nodes outside the band hold the values edge(i, k) (a function of
+	arrays of time steps and nodes, nan if edge is None). One node on either side of the band is stored as well,
+	so that the children of the band nodes are always stored (the band moves by at most one node per time step).
+	The stored nodes of time step i occupy band_data[offset[i] : offset[i+1]], starting from the node lo[i] - 1.
+	'''
+
+	def __init__(self, N, lo, hi, edge=None, fill=False):
+		'''
+		Instantiate a lattice with expiry time N keeping the nodes lo[i] to hi[i] of time step i.
+		If fill is True all the stored nodes are set by edge (e.g. the risky security prices).
+		'''
+		self.N = N
+		self.lo = np.asarray(lo[:N+1], dtype=np.int64)
+		self.hi = np.asarray(hi[:N+1], dtype=np.int64)
+		self.edge = edge
+
+		#Stored nodes including the edge node on either side:
+		self.s_lo = np.maximum(self.lo - 1, 0)
+		self.s_hi = np.minimum(self.hi + 1, np.arange(N+1))
+		count = self.s_hi - self.s_lo + 1
+		self.offset = np.concatenate(([0], np.cumsum(count)))
+		self.band_data = np.zeros(int(self.offset[-1]))
+
+		if fill:
+			i = np.repeat(np.arange(N+1), count)
+			k = np.arange(len(self.band_data)) - np.repeat(self.offset[:-1] - self.s_lo, count)
+			pos = slice(None)
+		else:
+			#The edge nodes on the low and the high side of the band:
+			low = np.flatnonzero(self.s_lo < self.lo)
+			high = np.flatnonzero(self.s_hi > self.hi)
+			i = np.concatenate((low, high))
+			k = np.concatenate((self.s_lo[low], self.s_hi[high]))
+			pos = np.concatenate((self.offset[low], self.offset[high+1] - 1))
+		self.band_data[pos] = np.nan if edge is None else edge(i, k)
+
+	def band(self, i):
+		'''
+		Return the nodes lo[i] to hi[i] at time step i as a view on the band array
+		'''
+		first = self.offset[i] + self.lo[i] - self.s_lo[i]
+		return self.band_data[first:first + self.hi[i] - self.lo[i] + 1]
+
+	def nodes(self, i, a, b):
+		'''
+		Return the nodes a to b-1 at time step i, a view on the band array if they are all stored
+		'''
+		lo = int(self.s_lo[i])
+		hi = int(self.s_hi[i]) + 1
+		first = int(self.offset[i])
+		if lo <= a and b <= hi:
+			return self.band_data[first+a-lo:first+b-lo]
+
+		val = np.empty(b - a)
+		c = min(max(lo, a), b)
+		e = max(min(hi, b), c)
+		val[c-a:e-a] = self.band_data[first+c-lo:first+e-lo]
+		for f, g in ((a, c), (e, b)):
+			if f < g:
+				val[f-a:g-a] = np.nan if self.edge is None else self.edge(i, np.arange(f, g))
+		return val
+
+	def level(self, i):
+		'''
+		Return all the nodes at time step i (a copy, with the nodes outside the band filled in by edge)
+		'''
+		return self.nodes(i, 0, i+1)
+
+
+class LatticeNode:
+	'''
+	Node object handed out by LatticeTree and HeapTree. It has the same class members as TreeNode (data and
+	children), the children are looked up from the tree only when they are requested.
+	'''
+
+	def __init__(self, tree, index, data):
+		'''
+		Instantiate a node
+		'''
+		self.data = data
+		self._tree = tree
+		self._index = index
+
+	@property
+	def children(self):
+		'''
+		The up and down children of the node (empty at the expiry time)
+		'''
+		child = 2*self._index + 1
+		if child >= self._tree.size:
+			return []
+		return [self._tree[child], self._tree[child+1]]
+
+
+class LatticeTree:
+	'''
+	Adapter giving a Lattice (or BandLattice) the layout of a binary tree of TreeNode objects,
+	i.e. a list of 2^(N+1) - 1 nodes where the children of node j are nodes 2j+1 (up) and 2j+2 (down).
+	Node j lies at time step floor(log2(j+1)); the binary digits of its position within the time step
+	record the path (0: up, 1: down), so the number of ones is the lattice node.
+	No node object is stored, they are created on access.
+	'''
+
+	def __init__(self, lattice):
+		'''
+		Instantiate the adapter around a Lattice or BandLattice object
+		'''
+		self.lattice = lattice
+		#The number of nodes, a Python int (len() is not defined since it overflows for N >= 63):
+		self.size = (1 << (lattice.N+1)) - 1
+
+	def __getitem__(self, j):
+		j = int(j)
+		if j < 0:
+			j = j + self.size
+		if j < 0 or j >= self.size:
+			raise IndexError("node index out of range")
+
+		level = (j+1).bit_length() - 1
+		k = bin(j + 1 - (1 << level)).count('1')
+		return LatticeNode(self, j, float(self.lattice.nodes(level, k, k+1)[0]))
+
+
+class HeapTree:
+	'''
+	Create a binary tree object for values that depend on the path (not only on the lattice node).
+	All nodes are stored in one contiguous float64 array (data) in the layout of a list of TreeNode objects,
+	i.e. time step i occupies data[2^i - 1 : 2^(i+1) - 1] and the children of node j are nodes 2j+1 (up)
+	and 2j+2 (down). Indexing hands out nodes with the class members of TreeNode (data and children).
+	'''
+
+	def __init__(self, N, data=None):
+		'''
+		Instantiate the tree up to time step N (zero-filled unless data is given)
+		'''
+		self.N = N
+		self.size = (1 << (N+1)) - 1
+		self.data = np.zeros(self.size) if data is None else np.asarray(data, dtype=np.float64)
+
+	def __len__(self):
+		return self.size
+
+	def level(self, i):
+		'''
+		Return the view of the nodes at time step i
+		'''
+		return self.data[(1 << i) - 1:(1 << (i+1)) - 1]
+
+	def __getitem__(self, j):
+		j = int(j)
+		if j < 0:
+			j = j + self.size
+		if j < 0 or j >= self.size:
+			raise IndexError("node index out of range")
+
+		return LatticeNode(self, j, float(self.data[j]))
+
+
+def as_lattice(node):
+	'''
+	Return the lattice holding the nodes of a Lattice or LatticeTree object.
 	C. Wibisono
-	05/20 '25
+	10/17 '26
+	Function Argument(s):
+	node: (Lattice, BandLattice or LatticeTree object) the nodes of the binomial model
+	Return:
+	lattice: (Lattice or BandLattice object) the lattice behind the nodes
+	'''
+
+	if isinstance(node, LatticeTree):
+		return node.lattice
+	if isinstance(node, (Lattice, BandLattice)):
+		return node
+	raise TypeError("expected a Lattice or LatticeTree object, got "+type(node).__name__)
+
+
+def risky_security_binom_lattice(N, S_0, U, D):
+	'''
+	Compute the risky security prices up to expiry time N on a recombining lattice.
+	C. Wibisono
+	10/17 '26
 	Function Argument(s):
 	N: (int) the number of trial (time-step) or expiry time
 	S_0: (float) the initial price associated with the risky security
 	U: (float) the rate of the return if the risky security price goes up
 	D: (float) the rate of the return if the risky security price goes down
 	Return:
-	node: (list) array of TreeNode objects (see TreeNode object class to retrive the class member)
+	lattice: (Lattice object) risky security prices, node k at time step i is S_0(1+U)^(i-k)(1+D)^k
 	'''
-	
-	#Create nodes container for storing the possible risky security prices according to binomial model.
-	node = []
 
-	#The first element becomes a root of the tree object
-	node.append(TreeNode(S_0))
+	lattice = Lattice(N)
+	for i in range(N+1):
+		lattice.level(i)[:] = risky_security_binom_node(i, np.arange(i+1), S_0, U, D)
 
-	#In the visual representation we will form as many as 2^(N+1) - 1 nodes.
-	dim = math.pow(2,N+1) -1 
+	return lattice
 
-	#Create nodes consisting of possibles risky security prices:
-	dim_temp = int(math.pow(2,N))-1 	
-	for i in range(dim_temp):
-		up = node[i].data*(1+U)
-		down = node[i].data*(1+D)
-		n_up = TreeNode(up)
-		n_down =  TreeNode(down)
-		node.append(n_up)
-		node.append(n_down)
-		node[i].add_child(n_up)
-		node[i].add_child(n_down) 
 
-	return node	
+def risky_security_binom_node(i, k, S_0, U, D):
+	'''
+	Compute the risky security price at the node k (the number of down moves) of time step i.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	i: (int or array) the time step
+	k: (int or array) the node within the time step
+	S_0: (float) the initial price associated with the risky security
+	U: (float) the rate of the return if the risky security price goes up
+	D: (float) the rate of the return if the risky security price goes down
+	Return:
+	S: (float or array) the risky security price S_0(1+U)^(i-k)(1+D)^k
+	'''
+
+	return S_0*np.power(1.+U, i-k)*np.power(1.+D, k)
+
+
+def risky_security_binom_price(N, S_0, U, D):
+	'''
+	Compute the risky security prices up to expiry time N to be used in conjunction with the American Option.
+	C. Wibisono
+	05/20 '25
+	Function Argument(s):
+	N: (int) the number of trial (time-step) or expiry time
+	S_0: (float) the initial price associated with the risky security
+	U: (float) the rate of the return if the risky security price goes up
+	D: (float) the rate of the return if the risky security price goes down
+	Return:
+	node: (LatticeTree object) tree of 2^(N+1) - 1 nodes backed by a recombining lattice
+	(see LatticeTree object class to retrieve the class member)
+	'''
+
+	return LatticeTree(risky_security_binom_lattice(N, S_0, U, D))
 
 def risky_security_binom_price_level(level, node):
 	'''
@@ -178,11 +547,24 @@ def risky_security_binom_price_level(level, node):
 	05/20 '25
 	Function Argument(s):
 	level: (int) the time step when the nodes are retrieved.
-	node: (list of TreeNode objects) the array of TreeNode objects from the risky_security_binom_price
+	node: (list of TreeNode objects or LatticeTree object) the nodes from the risky_security_binom_price
 	return:
 	arr: (dict consisting of risky security price and its childs at time level)
 	'''
 	arr = {}
+
+	#Read the time step straight off the lattice (node k has the children k and k+1 at the next time step):
+	if isinstance(node, LatticeTree):
+		lattice = node.lattice
+		price = lattice.level(level)
+		for k in range(level+1):
+			if level < lattice.N:
+				child = lattice.level(level+1)
+				arr[float(price[k])] = [float(child[k]), float(child[k+1])]
+			else:
+				arr[float(price[k])] = [0,0]
+		return arr
+
 	low = int(math.pow(2, level)) - 1
 	up = int(math.pow(2,level+1))-1
 	dim = len(node)
@@ -202,7 +584,7 @@ if __name__ == "__main__":
 	N =int(sys.argv[1])
 	level = int(sys.argv[2])
 	ans = risky_security_binom_price(N,60,0.1,-0.05)
-	n = len(ans)
+	n = ans.size
 	print("number_of_nodes:",n,"compute:",int(math.pow(2,N+1))-1)
 	print("nodes for level: "+str(level))
 	low = int(math.pow(2,level))-1
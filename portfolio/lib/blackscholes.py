@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import math
-import random
+import numpy as np
 from . import binomial as bo
+from . import contract as co
 
 '''
 Module Description:
@@ -17,21 +18,91 @@ def return_h(mu, sigma, T, N):
 	C. Wibisono
 	05/28 '25
 	Function Argument(s):
-	mu: (float) expected logarithmic return of risky security per unit time
-	sigma: (float) volatility of the risky security
+	mu: (float or array) expected logarithmic return of risky security per unit time
+	sigma: (float or array) volatility of the risky security
 	T: (int) time measured in years
 	N: (int) number of steps
 	Return(s):
-	U: (float) the rate of the return if the risky security price goes up
-	D: (float) the rate of the return if the risky security price goes down
+	U: (float or array) the rate of the return if the risky security price goes up
+	D: (float or array) the rate of the return if the risky security price goes down
 	'''
 	
 	h = T/N
-	U_N = -1 + math.exp(mu*h + sigma*(math.pow(h,0.5)))  
-	D_N = -1 + math.exp(mu*h - sigma*(math.pow(h,0.5)))  
+	U_N = -1 + np.exp(mu*h + sigma*(np.sqrt(h)))  
+	D_N = -1 + np.exp(mu*h - sigma*(np.sqrt(h)))  
 	
 	return U_N, D_N
 
+def return_h_lr(S, X, r, sigma, T, N):
+	'''
+	Compute single step returns following the Leisen-Reimer parameterisation, where the up and down probabilities
+	are taken from the Peizer-Pratt inversion of the Black-Scholes d1 and d2 so that the binomial model centres
+	on the strike price. The binomial prices then converge smoothly (without the odd-even oscillation) at a rate 1/N^2
+	for the European options. N should be odd.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	S: (float or array) the risky security price at time 0
+	X: (float or array) strike price.
+	r: (float or array) continuosly compounded risk-free interest rate
+	sigma: (float or array) volatility of the risky security
+	T: (float or array) time measured in years
+	N: (int) number of steps
+	Return(s):
+	R: (array) the single step rate of risk-free security exp(rT/N) - 1
+	U: (array) the rate of the return if the risky security price goes up
+	D: (array) the rate of the return if the risky security price goes down
+	'''
+
+	S, X, r, sigma, T = [np.asarray(v, dtype=np.float64) for v in (S, X, r, sigma, T)]
+
+	h = T/N
+	d1, d2 = eu_call_bound_cdf(S, 0, T, r, sigma, X)
+
+	#Peizer-Pratt method 2 inversion of the normal distribution to the binomial distribution:
+	def h_pp(z):
+		a = z/(N + 1./3. + 0.1/(N + 1.))
+		return 0.5 + np.sign(z)*0.5*np.sqrt(1. - np.exp(-a*a*(N + 1./6.)))
+
+	p = h_pp(d2)
+	p_b = h_pp(d1)
+
+	growth = np.exp(r*h)
+	up = growth*p_b/p
+	down = (growth - p*up)/(1. - p)
+
+	return growth - 1., up - 1., down - 1.
+
+def risky_security_binom_dist(mu, sigma, S_0, T, N, p):
+	'''
+	Compute the distribution of risky security price at time T based on N-step binomial model.
+	The price after k up moves is S_0(1+U)^k(1+D)^(N-k) with the binomial probability of k successes.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	mu: (float or array) expected logarithmic return of risky security per unit time
+	sigma: (float or array) volatility of the risky security
+	S_0 : (float) the initial price associated with the risky security
+	T: (int) time measured in years
+	N: (int) number of steps
+	p: (float or array) the probability of the risky security price to go up.
+	Note that mu, sigma and p are broadcast against each other.
+	Return(s):
+	price: (array) the risky security prices at time step N for k = 0, ..., N up moves along the last axis
+	prob: (array) the probability of each risky security price along the last axis
+	'''
+
+	mu, sigma, p = np.broadcast_arrays(*[np.asarray(v, dtype=np.float64) for v in (mu, sigma, p)])
+
+	#Compute the single step returns:
+	U_N, D_N = return_h(mu, sigma, T, N)
+
+	k = np.arange(N+1)
+	price = S_0*np.exp(k*np.log1p(U_N)[..., None] + (N - k)*np.log1p(D_N)[..., None])
+	prob = bo.binom_pmf(N, p)
+
+	return price, prob
+
 def risky_security_binom_price_level(mu, sigma, S_0, T, N, p):
 	'''
 	Compute the distribution of risky security price at time T based on N-step binomial model.
@@ -49,43 +120,14 @@ def risky_security_binom_price_level(mu, sigma, S_0, T, N, p):
 	'''
 	arr = {}
 	
-	#Compute the single step returns:
-	U_N, D_N = return_h(mu, sigma, T, N)
-
-	#Node to store the possible risky-security prices:
-	s_node = bo.risky_security_binom_price(N, S_0, U_N, D_N)
+	price, prob = risky_security_binom_dist(mu, sigma, S_0, T, N, p)
 
-	#Create nodes container for storing the probability of the possible risky security prices according to the binomial model:
-	prob_node = []
-	
-	#The first element becomes a root of the tree object with probability 1.
-	prob_node.append(bo.TreeNode(1))
-
-	#Number of possible nodes created with time step N:
-	dim = math.pow(2, N+1) - 1
-
-	#Create nodes consisting of possible risky security probabilities:
-	dim_temp = int(math.pow(2, N)) - 1
-	for i in range(dim_temp):
-		up = prob_node[i].data*(p)
-		down = prob_node[i].data*(1-p)
-		n_up = bo.TreeNode(up)
-		n_down = bo.TreeNode(down)
-		prob_node.append(n_up)
-		prob_node.append(n_down)
-		prob_node[i].add_child(n_up)
-		prob_node[i].add_child(n_down)
-
-
-	low = int(math.pow(2, N)) - 1
-	upper = int(math.pow(2, N+1)) - 1
-
-	for i in range(low, upper, 1):
-		temp = round(s_node[i].data,5)
+	for i in range(N+1):
+		temp = round(float(price[i]),5)
 		if temp in arr.keys():
-			arr[temp] = arr[temp] + prob_node[i].data #some different scenarios can lead to the same risky security prices
+			arr[temp] = arr[temp] + float(prob[i]) #some different scenarios can lead to the same risky security prices
 		else:
-			arr[temp] = prob_node[i].data
+			arr[temp] = float(prob[i])
 
 
 	return arr
@@ -105,7 +147,106 @@ def normal(x, mu, sigma):
 	C = math.exp(B)
 	return A*C
 
-def risky_security_black_scholes_price(mu, sigma, S_0, T):
+def _bs_terminal_counts(seed_seq, n, mu_b, sd, i_0, M, h, moments=False):
+	'''
+	Draw one block of logarithmic terminal prices and count them on the grid of bin width h.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	seed_seq: (numpy SeedSequence) the seed of the block
+	n: (int) the number of samples in the block
+	mu_b: (float) the mean of the logarithmic price
+	sd: (float) the standard deviation of the logarithmic price
+	i_0: (int) the grid index of the first bin (the bin centers are i*h)
+	M: (int) the number of bins
+	h: (float) the bin width
+	moments: (bool) whether to return the moments of the block as well
+	Return(s):
+	counts: (array of int) the number of samples in each bin (samples outside the grid are discarded)
+	mom: (tuple) the number of samples, their mean and the sum of squared deviations from the mean (if moments is True)
+	'''
+
+	rng = np.random.default_rng(seed_seq)
+	temp = rng.standard_normal(n)
+	temp *= sd
+	temp += mu_b
+	idx = np.rint(temp/h).astype(np.int64) - i_0
+	idx = idx[(idx >= 0) & (idx < M)]
+	counts = np.bincount(idx, minlength=M)
+
+	if moments:
+		mean = temp.mean() if n > 0 else 0.
+		return counts, (n, mean, float(((temp - mean)**2).sum()))
+
+	return counts
+
+
+def bs_terminal_grid(mu, sigma, S_0, T, h=0.01, width=8.):
+	'''
+	Compute the fixed grid of logarithmic prices used to bin the risky security price at time T.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	mu: (float) expected logarithmic return of risky security per unit time
+	sigma: (float) volatility of the risky security
+	S_0 : (float) the initial price associated with the risky security
+	T: (float) time measured in years
+	h: (float) the bin width of the logarithmic price
+	width: (float) the half-width of the grid in units of the standard deviation sigma*sqrt(T)
+	Return(s):
+	mu_b: (float) the mean of the logarithmic price
+	sd: (float) the standard deviation of the logarithmic price
+	i_0: (int) the grid index of the first bin (the bin centers are i*h)
+	M: (int) the number of bins
+	'''
+
+	mu_b = math.log(S_0) + mu*T
+	sd = sigma*math.sqrt(T)
+	i_0 = int(math.floor((mu_b - width*sd)/h))
+	M = int(math.ceil((mu_b + width*sd)/h)) - i_0 + 1
+
+	return mu_b, sd, i_0, M
+
+
+def risky_security_bs_sample(mu, sigma, S_0, T, sample_num=1000000, seed=None, h=0.01, width=8., chunk=262144):
+	'''
+	Sample the logarithmic risky security price at time T based on the Black-Scholes Model,
+	ln S(T) = ln S(0) + mu T + sigma W(T) with W(T) ~ N(0, T), and count the samples on a fixed grid.
+	The samples are drawn in blocks of chunk samples so the memory stays bounded, block b uses its own
+	stream spawned from numpy.random.SeedSequence(seed), hence the result only depends on seed and chunk.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	mu: (float) expected logarithmic return of risky security per unit time
+	sigma: (float) volatility of the risky security
+	S_0 : (float) the initial price associated with the risky security
+	T: (float) time measured in years
+	sample_num: (int) the number of samples
+	seed: (int or None) the seed of the random number generator (None to draw fresh entropy)
+	h: (float) the bin width of the logarithmic price
+	width: (float) the half-width of the grid in units of the standard deviation sigma*sqrt(T)
+	chunk: (int) the number of samples per block
+	Return(s):
+	x: (array) the logarithmic risky security prices at the bin centers
+	counts: (array of int) the number of samples in each bin
+	'''
+
+	mu_b, sd, i_0, M = bs_terminal_grid(mu, sigma, S_0, T, h, width)
+	n_block = -(-sample_num//chunk)
+	blocks = np.random.SeedSequence(seed).spawn(n_block)
+
+	#Compute the histogram block by block:
+	counts = np.zeros(M, dtype=np.int64)
+	for b in range(n_block):
+		n = min(chunk, sample_num - b*chunk)
+		counts += _bs_terminal_counts(blocks[b], n, mu_b, sd, i_0, M, h)
+
+	x = (i_0 + np.arange(M))*h
+
+	return x, counts
+
+
+def risky_security_black_scholes_price(mu, sigma, S_0, T, sample_num=1000000, seed=None):
 	'''
 	Compute the distribution of the risky security price at time T based on the Black-Scholes Model.
 	C. Wibisono
@@ -115,58 +256,198 @@ def risky_security_black_scholes_price(mu, sigma, S_0, T):
 	sigma: (float) volatility of the risky security
 	S_0 : (float) the initial price associated with the risky security
 	T: (int) time measured in years
+	sample_num: (int) the number of samples
+	seed: (int or None) the seed of the random number generator
 	Return(s):
 	arr: (dictionary consisting of risky security price (in terms of loge) as key and its probability density for the very infinitesimal timesteps)
 	'''
 
-	arr = {}
-	mu_b = math.log(S_0) + mu*T
-	sample_num = 1000000
-	for i in range(sample_num):
-		temp = random.gauss(0, T)
-		temp_b = mu_b + temp*sigma
-		temp_c = round(temp_b, 2)
-		if temp_c in arr.keys():
-			arr[temp_c] = arr[temp_c] + 1
-		else:
-			arr[temp_c] = 1
+	x, counts = risky_security_bs_sample(mu, sigma, S_0, T, sample_num, seed)
+	nz = np.flatnonzero(counts)
+	arr = dict(zip(np.round(x[nz], 2).tolist(), counts[nz].tolist()))
 
-	
 	return arr
 
-def eu_call_bound_cdf(S_t, t, T, r, sigma, X):
+
+def eu_call_bound_cdf(S_t, t, T, r, sigma, X, q=0.):
 	'''
 	Compute the upper and lower bound for calculating the cumulative distribution function used for 
 	calculating the European Call Option from the Black-Scholes Model.
 	C. Wibisono
 	06/01 '25
 	Function Argument(s):
-	S_t: (float) the risky security price at time t
+	S_t: (float or array) the risky security price at time t
 	t: (int) the present time in which the asset is evaluated
 	T: (int) exercised time.
-	r: (float) continuosly compounded risk-free interest rate ---> exp(rt) instead of (1+R)^N where T=N*h
-	sigma: (float) volatility of the risky security
-	X: (float) strike price.
+	r: (float or array) continuosly compounded risk-free interest rate ---> exp(rt) instead of (1+R)^N where T=N*h
+	sigma: (float or array) volatility of the risky security
+	X: (float or array) strike price.
+	q: (float or array) continuously compounded dividend yield of the risky security
 	Return(s):
-	dmax: (float) the upper bound of the cdf
-	dmin: (float) the lower bound of the cdf
+	dmax: (float or array) the upper bound of the cdf
+	dmin: (float or array) the lower bound of the cdf
 	'''
 
-	a = math.log(S_t/X)
-	b1 = r + 0.5*math.pow(sigma,2.)
-	b2 = r - 0.5*math.pow(sigma,2.)
+	a = np.log(S_t/X)
+	b1 = r - q + 0.5*np.power(sigma,2.)
+	b2 = r - q - 0.5*np.power(sigma,2.)
 	num1 = a + b1*(T-t)
 	num2 = a + b2*(T-t)
-	denum = sigma*math.pow(T-t,0.5)
+	denum = sigma*np.sqrt(T-t)
 
 	dmax = num1/denum
 	dmin = num2/denum
 
 	return dmax, dmin
 
-def eu_option_bs(S_t, t, T, r, sigma, X):
+_SQRT1_2 = math.sqrt(0.5)
+
+#Coefficients of the rational Chebyshev approximations of W. J. Cody (Math. Comp. 23, 1969) for |x| <= 0.5 (erf),
+#0.5 < |x| <= 4 and |x| > 4 (erfc), relative error below 1e-16 in double precision:
+_ERF_A = (3.16112374387056560e00, 1.13864154151050156e02, 3.77485237685302021e02, 3.20937758913846947e03,
+	1.85777706184603153e-1)
+_ERF_B = (2.36012909523441209e01, 2.44024637934444173e02, 1.28261652607737228e03, 2.84423683343917062e03)
+_ERF_C = (5.64188496988670089e-1, 8.88314979438837594e00, 6.61191906371416295e01, 2.98635138197400131e02,
+	8.81952221241769090e02, 1.71204761263407058e03, 2.05107837782607147e03, 1.23033935479799725e03,
+	2.15311535474403846e-8)
+_ERF_D = (1.57449261107098347e01, 1.17693950891312499e02, 5.37181101862009858e02, 1.62138957456669019e03,
+	3.29079923573345963e03, 4.36261909014324716e03, 3.43936767414372164e03, 1.23033935480374942e03)
+_ERF_P = (3.05326634961232344e-1, 3.60344899949804439e-1, 1.25781726111229246e-1, 1.60837851487422766e-2,
+	6.58749161529837803e-4, 1.63153871373020978e-2)
+_ERF_Q = (2.56852019228982242e00, 1.87295284992346725e00, 5.27905102951428412e-1, 6.05183413124413191e-2,
+	2.33520497626869185e-3)
+
+def _erfc(y):
+	'''
+	Complementary error function of a float64 array of non-negative arguments evaluated with Cody's rational
+	approximations (erfc(-y) = 2 - erfc(y) for negative arguments).
+	'''
+
+	val = np.empty_like(y)
+
+	#y <= 0.5: erfc(y) = 1 - y R(y^2):
+	small = y <= 0.5
+	z = y[small]
+	ysq = z*z
+	a, b = _ERF_A, _ERF_B
+	num = a[4]*ysq
+	den = ysq.copy()
+	for i in range(3):
+		num += a[i]
+		num *= ysq
+		den += b[i]
+		den *= ysq
+	val[small] = 1. - z*(num + a[3])/(den + b[3])
+
+	#y > 0.5: erfc(y) = exp(-y^2) R(y), the exponent split as in Cody's code to keep its precision:
+	big = ~small
+	z = np.minimum(y[big], 27.)
+	c, d = _ERF_C, _ERF_D
+	num = c[8]*z
+	den = z.copy()
+	for i in range(7):
+		num += c[i]
+		num *= z
+		den += d[i]
+		den *= z
+	r = (num + c[7])/(den + d[7])
+
+	tail = z > 4.
+	if np.any(tail):
+		u = z[tail]
+		ysq = 1./(u*u)
+		p, q = _ERF_P, _ERF_Q
+		num = p[5]*ysq
+		den = ysq.copy()
+		for i in range(4):
+			num += p[i]
+			num *= ysq
+			den += q[i]
+			den *= ysq
+		r[tail] = (1./math.sqrt(math.pi) - ysq*(num + p[4])/(den + q[4]))/u
+		r[z > 26.543] = 0.
+
+	zsq = np.floor(z*16.)*0.0625
+	r *= np.exp(-zsq*zsq)
+	r *= np.exp(-(z - zsq)*(z + zsq))
+	val[big] = r
+
+	return val
+
+def _norm_cdf_tails(x):
+	'''
+	Evaluate N(x) and N(-x) from a single complementary error function, the smaller of the two directly.
+	'''
+
+	x = np.asarray(x, dtype=np.float64)
+	y = x.ravel()
+	small = 0.5*_erfc(np.abs(y)*_SQRT1_2)
+	large = 1. - small
+	neg = y < 0
+	val = large.copy()
+	np.copyto(val, small, where=neg)
+	np.copyto(large, small, where=~neg)
+	return val.reshape(x.shape), large.reshape(x.shape)
+
+def norm_cdf(x):
+	'''
+	Cumulative Distribution Function of the standard normal distribution evaluated to full double precision
+	with the complementary error function: N(x) = erfc(-x/sqrt(2))/2 (see _erfc).
+	Function Argument:
+	x: (float or array) the argument.
+	Return:
+	val: (float or array) N(x).
+	'''
+
+	val = _norm_cdf_tails(x)[0]
+	return val[()]
+
+def eu_option_bs_batch(S_t, t, T, r, sigma, X, q=0.):
+	'''
+	Compute the European Call and Put Options Price at time t with an exercise time T following the Black-Scholes Model
+	for a batch of contracts. With a continuous dividend yield q (Merton) the risky security is discounted by
+	contract.bond(q, t, T), so that C_E - P_E = S_t bond(q, t, T) - X bond(r, t, T) as checked by
+	option.eu_put_call_div_cont and C_E, P_E are priced on the forward contract.fow_price_div.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	S_t: (float or array) the risky security price at time t
+	t: (float or array) the present time in which the asset is evaluated
+	T: (float or array) exercised time.
+	r: (float or array) continuosly compounded risk-free interest rate ---> exp(rt) instead of (1+R)^N where T=N*h
+	sigma: (float or array) volatility of the risky security
+	X: (float or array) strike price.
+	q: (float or array) continuously compounded dividend yield of the risky security
+	Note that the arguments are broadcast against each other.
+	Return(s):
+	C_E: (array) European call prices at time t.
+	P_E: (array) European put prices at time t.
+	'''
+
+	S_t, t, T, r, sigma, X, q = [np.asarray(v, dtype=np.float64) for v in (S_t, t, T, r, sigma, X, q)]
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		dmax, dmin = eu_call_bound_cdf(S_t, t, T, r, sigma, X, q)
+	contract = X*co.bond(r, t, T)
+	S_q = S_t*co.bond(q, t, T)
+
+	N_max, N_max_p = _norm_cdf_tails(dmax)
+	N_min, N_min_p = _norm_cdf_tails(dmin)
+	C_E = S_q*N_max - contract*N_min
+	P_E = contract*N_min_p - S_q*N_max_p
+
+	#At expiry (or without volatility) the options are worth their discounted intrinsic values:
+	zero = (T - t)*sigma*sigma <= 0
+	if np.any(zero):
+		C_E = np.where(zero, np.maximum(S_q - contract, 0.), C_E)[()]
+		P_E = np.where(zero, np.maximum(contract - S_q, 0.), P_E)[()]
+
+	return C_E, P_E
+
+def eu_option_bs(S_t, t, T, r, sigma, X, q=0.):
 	'''
 	Compute the European Call and Put Options Price at time t with an exercise time T following the Black-Scholes Model.
+	Scalar path evaluated with the math module only (no arrays), use eu_option_bs_batch for many contracts.
 	C. Wibisono
 	06/01 '25
 	Function Argument(s):
@@ -176,77 +457,249 @@ def eu_option_bs(S_t, t, T, r, sigma, X):
 	r: (float) continuosly compounded risk-free interest rate ---> exp(rt) instead of (1+R)^N where T=N*h
 	sigma: (float) volatility of the risky security
 	X: (float) strike price.
+	q: (float) continuously compounded dividend yield of the risky security
 	Return(s):
 	C_E: (float) European call price at time t.
 	P_E: (float) European put price at time t.
 	'''
-	
-	dmax, dmin = eu_call_bound_cdf(S_t, t, T, r, sigma, X)
-	dmax = round(dmax,3)
-	dmin = round(dmin,3)
-	print("dmax:",dmax,"dmin:",dmin)
-	x = []
-	y = []
-	normalize = 0
-	for i in range(-3000,3001,1):
-		temp = i*0.001
-		y_temp = normal(temp,0,1.)
-		x.append(temp)
-		y.append(y_temp)
-		#print("x:",temp,"y:",y_temp)
-		normalize = normalize + y_temp
-	N_max = 0
-	N_min = 0
-	dim = len(x)
-	for k1 in range(dim):
-		if x[k1] <= dmax:
-			N_max = N_max + y[k1]
-		else:
-			break
 
-	for k2 in range(dim):
-		if x[k2] <= dmin:
-			N_min = N_min + y[k2]
-		else:
-			break
-	
-	#Normalize the CDF:
-	N_max = N_max/normalize
-	N_min = N_min/normalize
-
-	term1 = S_t*N_max
-	term2 = X*(math.exp(-r*(T-t)))*N_min
-	print("S_t:",S_t,"N_max:",N_max,"term1:", term1)
-	print("Contract:",X*math.exp(-r*(T-t)),"N_min:",N_min,"term2:",term2)
-	C_E = term1 - term2
-	
-	N_max_p = 0
-	N_min_p = 0
-	for k3 in range(dim):
-		if x[k3] <= -dmax:
-			N_max_p = N_max_p + y[k3]
-		else:
-			break
+	tau = T - t
+	vol = sigma*math.sqrt(tau)
+	contract = X*math.exp(-r*tau)
+	S_q = S_t*math.exp(-q*tau)
+	if vol <= 0:
+		#At expiry (or without volatility) the options are worth their discounted intrinsic values:
+		return max(S_q - contract, 0.), max(contract - S_q, 0.)
+
+	dmax = (math.log(S_t/X) + (r - q)*tau)/vol + 0.5*vol
+	dmin = dmax - vol
+
+	C_E = S_q*0.5*math.erfc(-dmax*_SQRT1_2) - contract*0.5*math.erfc(-dmin*_SQRT1_2)
+	P_E = contract*0.5*math.erfc(dmin*_SQRT1_2) - S_q*0.5*math.erfc(dmax*_SQRT1_2)
 
-	for k4 in range(dim):
-		if x[k4] <= -dmin:
-			N_min_p = N_min_p + y[k4]
-		else:
-			break
-	
-	#Normalize the CDF	
-	N_max_p = N_max_p/normalize
-	N_min_p = N_min_p/normalize
-
-	term1p = X*(math.exp(-r*(T-t)))*N_min_p
-	term2p = S_t*N_max_p
-	P_E = term1p - term2p
-	print("Contract:",X*math.exp(-r*(T-t)),"N_min_p:",N_min_p,"term2:",term1p)
-	print("S_t:",S_t,"N_max_put:",N_max_p,"term1:", term2p)
-	
 	return C_E, P_E
 
 
+def norm_pdf(x):
+	'''
+	Probability Density Function of the standard normal distribution.
+	Function Argument:
+	x: (float or array) the argument.
+	Return:
+	val: (float or array) n(x).
+	'''
+
+	x = np.asarray(x, dtype=np.float64)
+	val = np.exp(-0.5*x*x)/math.sqrt(2.*math.pi)
+	return val[()]
+
+def norm_ppf(p):
+	'''
+	Inverse of the Cumulative Distribution Function of the standard normal distribution.
+	The rational approximation of P. J. Acklam (relative error 1.15e-9) is refined by one Halley step
+	on the exact N(x), which brings it to full double precision.
+	Function Argument:
+	p: (float or array) the probability in (0, 1).
+	Return:
+	val: (float or array) x such that N(x) = p.
+	'''
+
+	p = np.asarray(p, dtype=np.float64)
+	a = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+		1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+	b = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+		6.680131188771972e+01, -1.328068155288572e+01)
+	c = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+		-2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+	d = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+
+	#Compute the central region:
+	q = p - 0.5
+	r = q*q
+	num = ((((a[0]*r + a[1])*r + a[2])*r + a[3])*r + a[4])*r + a[5]
+	den = ((((b[0]*r + b[1])*r + b[2])*r + b[3])*r + b[4])*r + 1.
+	val = num*q/den
+
+	#Compute the tails (by symmetry on the lower tail):
+	with np.errstate(divide='ignore', invalid='ignore'):
+		s = np.sqrt(-2.*np.log(np.minimum(p, 1. - p)))
+		num = ((((c[0]*s + c[1])*s + c[2])*s + c[3])*s + c[4])*s + c[5]
+		den = (((d[0]*s + d[1])*s + d[2])*s + d[3])*s + 1.
+		tail = np.where(q < 0, num/den, -num/den)
+	val = np.where(np.abs(q) > 0.5 - 0.02425, tail, val)
+	val = np.where(p == 0., -np.inf, np.where(p == 1., np.inf, val))
+
+	#Compute one Halley step:
+	with np.errstate(over='ignore', invalid='ignore'):
+		e = norm_cdf(val) - p
+		u = e*math.sqrt(2.*math.pi)*np.exp(0.5*val*val)
+		val = np.where(np.isfinite(u), val - u/(1. + 0.5*val*u), val)
+	return val[()]
+
+def eu_option_greeks(S_t, t, T, r, sigma, X, q=0.):
+	'''
+	Compute the European call and put sensitivities at time t with an exercise time T based on the Black-Scholes Model
+	for a batch (or broadcastable grid) of contracts. d1, d2, the normal density and the discount factor are
+	computed once and shared by all sensitivities.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	S_t: (float or array) the risky security price at time t
+	t: (float or array) the present time in which the asset is evaluated
+	T: (float or array) exercised time.
+	r: (float or array) continuosly compounded risk-free interest rate ---> exp(rt) instead of (1+R)^N where T=N*h
+	sigma: (float or array) volatility of the risky security
+	X: (float or array) strike price.
+	q: (float or array) continuously compounded dividend yield of the risky security
+	Note that the arguments are broadcast against each other.
+	Return(s):
+	greek_params: (dict) Dictionary of the European call ('C_E') and put ('P_E') sensitivities, each a dictionary
+	containing greek parameters (key) and their values (array):
+	delta (dV/dS), gamma (d2V/dS2), vega (dV/dsigma), theta (dV/dt), rho (dV/dr), psi (dV/dq),
+	vanna (d2V/dSdsigma), volga (d2V/dsigma2) and charm (d2V/dSdt).
+	gamma, vega, vanna and volga are the same arrays for the call and the put.
+	'''
+
+	S_t, t, T, r, sigma, X, q = [np.asarray(v, dtype=np.float64) for v in (S_t, t, T, r, sigma, X, q)]
+
+	#Shared terms:
+	tau = T - t
+	sqrt_tau = np.sqrt(tau)
+	d_max, d_min = eu_call_bound_cdf(S_t, t, T, r, sigma, X, q)
+	disc_q = co.bond(q, t, T)
+	n_max = disc_q*norm_pdf(d_max)
+	contract = X*co.bond(r, t, T)
+	N_max, N_max_p = _norm_cdf_tails(d_max)
+	N_max = disc_q*N_max
+	N_max_p = disc_q*N_max_p
+	N_min, N_min_p = _norm_cdf_tails(d_min)
+
+	gamma = n_max/(S_t*sigma*sqrt_tau)
+	vega = S_t*n_max*sqrt_tau
+	vanna = -n_max*d_min/sigma
+	volga = vega*d_max*d_min/sigma
+	charm = -n_max*(2.*(r - q)*tau - d_min*sigma*sqrt_tau)/(2.*tau*sigma*sqrt_tau)
+	theta_0 = -S_t*sigma*n_max/(2.*sqrt_tau)
+
+	greek_params = {}
+	greek_params['C_E'] = {
+		'delta': N_max,
+		'gamma': gamma,
+		'vega': vega,
+		'theta': theta_0 + q*S_t*N_max - r*contract*N_min,
+		'rho': tau*contract*N_min,
+		'psi': -tau*S_t*N_max,
+		'vanna': vanna,
+		'volga': volga,
+		'charm': charm + q*N_max,
+	}
+	greek_params['P_E'] = {
+		'delta': -N_max_p,
+		'gamma': gamma,
+		'vega': vega,
+		'theta': theta_0 - q*S_t*N_max_p + r*contract*N_min_p,
+		'rho': -tau*contract*N_min_p,
+		'psi': tau*S_t*N_max_p,
+		'vanna': vanna,
+		'volga': volga,
+		'charm': charm - q*N_max_p,
+	}
+
+	return greek_params
+
+
+def eu_implied_vol(V, S_t, t, T, r, X, call=True, tol=1e-10, max_iter=100, sigma_lo=1e-6, sigma_hi=10., q=0.):
+	'''
+	Compute the implied volatility of European options from their market prices following the Black-Scholes Model
+	for a batch of contracts (e.g. a whole option chain). Each contract is solved with the Newton method using vega,
+	safeguarded by a bracket on the volatility: whenever the Newton step leaves the bracket (or vega vanishes)
+	the bracket is bisected instead. In-the-money prices are turned into the out-of-the-money prices by the put-call
+	parity, so that the tolerance applies to the time value of the option.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	V: (float or array) the market price of the option at time t
+	S_t: (float or array) the risky security price at time t
+	t: (float or array) the present time in which the asset is evaluated
+	T: (float or array) exercised time.
+	r: (float or array) continuosly compounded risk-free interest rate
+	X: (float or array) strike price.
+	call: (bool or array of bool) whether the price is of a call (True) or a put (False) option
+	tol: (float) the relative tolerance on the out-of-the-money option price (or on the volatility)
+	max_iter: (int) the maximum number of iterations
+	sigma_lo: (float) the lower end of the volatility bracket
+	sigma_hi: (float) the upper end of the volatility bracket
+	q: (float or array) continuously compounded dividend yield of the risky security
+	Note that the arguments are broadcast against each other.
+	Return(s):
+	sigma: (array) the implied volatility (nan where the price violates the no-arbitrage bounds)
+	status: (array of int) 0 if converged, 1 if not converged within max_iter iterations,
+	2 if the price lies outside the no-arbitrage bounds of the Black-Scholes price over the volatility bracket
+	'''
+
+	V, S_t, t, T, r, X, q, call = np.broadcast_arrays(*[np.asarray(v, dtype=np.float64) for v in (V, S_t, t, T, r, X, q)],
+		np.asarray(call, dtype=bool))
+	shape = V.shape
+	V, S_t, t, T, r, X, q, call = [v.ravel() for v in (V, S_t, t, T, r, X, q, call)]
+
+	#Put-call parity C_E - P_E = S_t exp(-q(T-t)) - X exp(-r(T-t)), price the out-of-the-money option:
+	parity = S_t*co.bond(q, t, T) - X*co.bond(r, t, T)
+	itm = np.where(call, parity > 0, parity < 0)
+	V = np.where(itm, np.where(call, V - parity, V + parity), V)
+	call = call ^ itm
+
+	def price(j, sig):
+		C_E, P_E = eu_option_bs_batch(S_t[j], t[j], T[j], r[j], sig, X[j], q[j])
+		return np.where(call[j], C_E, P_E)
+
+	sigma = np.full(V.shape, np.nan)
+	status = np.ones(V.shape, dtype=np.int64)
+
+	#The price increases with the volatility, check that the bracket contains the market price:
+	lo = np.full(V.shape, float(sigma_lo))
+	hi = np.full(V.shape, float(sigma_hi))
+	j = np.arange(len(V))
+	bounded = (price(j, lo) <= V*(1. + tol)) & (V*(1. - tol) <= price(j, hi)) & (V > 0)
+	status[~bounded] = 2
+
+	#Initial guess (Manaster-Koehler):
+	tau = T - t
+	guess = np.sqrt(2.*np.abs(np.log(S_t/X) + (r - q)*tau)/tau)
+	sig = np.clip(np.where(guess > 0, guess, 0.2), sigma_lo, sigma_hi)
+
+	active = np.flatnonzero(bounded)
+	sig = sig[active]
+	lo = lo[active]
+	hi = hi[active]
+	for it in range(max_iter):
+		if len(active) == 0:
+			break
+
+		diff = price(active, sig) - V[active]
+		done = (np.abs(diff) <= tol*V[active]) | (hi - lo <= tol*sig)
+		sigma[active[done]] = sig[done]
+		status[active[done]] = 0
+
+		#Update the bracket and keep the contracts not yet converged:
+		lo = np.where(diff < 0, sig, lo)
+		hi = np.where(diff > 0, sig, hi)
+		keep = ~done
+		active, sig, lo, hi, diff = active[keep], sig[keep], lo[keep], hi[keep], diff[keep]
+
+		d_max, d_min = eu_call_bound_cdf(S_t[active], t[active], T[active], r[active], sig, X[active], q[active])
+		vega = S_t[active]*co.bond(q[active], t[active], T[active])*norm_pdf(d_max)*np.sqrt(tau[active])
+
+		with np.errstate(divide='ignore', invalid='ignore'):
+			newton = sig - diff/vega
+		bisect = (hi - lo < 0.5*np.abs(newton - sig)) | ~(newton > lo) | ~(newton < hi)
+		sig = np.where(bisect, 0.5*(lo + hi), newton)
+
+	#Keep the last iterate for the contracts that did not converge:
+	sigma[active] = sig
+
+	return sigma.reshape(shape), status.reshape(shape)
+
+
 def eu_call_sensitivity(S_0, T, r, sigma, X):
 	'''
 	Compute the European call sensitivity with respect to several variables underlying the risky asset 
@@ -265,36 +718,11 @@ def eu_call_sensitivity(S_0, T, r, sigma, X):
 	
 	greek_params_CE = {}
 	d_max, d_min = eu_call_bound_cdf(S_0, 0, T, r, sigma, X)
-	d_max = round(d_max,3)
-	d_min = round(d_min,3)
-	
-	x = []
-	y = []
-	normalize = 0
-	for i in range(-3000,3001,1):
-		temp = i*0.001
-		y_temp = normal(temp,0,1.)
-		x.append(temp)
-		y.append(y_temp)
-		normalize = normalize + y_temp
-	N_max = 0
-	N_min = 0
-	dim = len(x)
-	for k1 in range(dim):
-		if x[k1] <= d_max:
-			N_max = N_max + y[k1]
-		else:
-			break
-
-	for k2 in range(dim):
-		if x[k2] <= d_min:
-			N_min = N_min + y[k2]
-		else:
-			break
+	d_max = float(d_max)
+	d_min = float(d_min)
 	
-	#Normalize the CDF:
-	N_max = N_max/normalize
-	N_min = N_min/normalize
+	N_max = float(norm_cdf(d_max))
+	N_min = float(norm_cdf(d_min))
 	
 	#Compute European Call sensitivity with respect to risky security price change:
 	delta_CE = N_max
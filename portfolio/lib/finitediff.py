@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+import numpy as np
+
+'''
+Module Description:
+Finite Difference Module:
+The Black-Scholes equation for the option value V(x, tau) in the logarithmic price x = ln S and the time to
+expiry tau = T - t,
+V_tau = sigma^2/2 V_xx + (r - q - sigma^2/2) V_x - r V,
+is discretised with central differences on a uniform grid in x and stepped with the Crank-Nicolson scheme.
+The early exercise of American options is enforced with the Brennan-Schwartz projection.
+C. Wibisono
+'''
+
+def tridiag_factor(a, b, c):
+	'''
+	Factorise the tridiagonal matrix with sub-diagonal a, diagonal b and super-diagonal c (Thomas algorithm).
+	The factorisation only depends on the matrix, so it is computed once for all the time steps.
+	The diagonals may hold several matrices as columns.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	a: (array) the sub-diagonal (a[0] is not used) of shape (M,) or (M, K)
+	b: (array) the diagonal of shape (M,) or (M, K)
+	c: (array) the super-diagonal (c[-1] is not used) of shape (M,) or (M, K)
+	Return(s):
+	cp: (array) the modified super-diagonal
+	den: (array) the pivots
+	'''
+
+	M = len(b)
+	cp = np.zeros(np.shape(b))
+	den = np.zeros(np.shape(b))
+	den[0] = b[0]
+	cp[0] = c[0]/den[0]
+	for j in range(1, M):
+		den[j] = b[j] - a[j]*cp[j-1]
+		cp[j] = c[j]/den[j]
+
+	return cp, den
+
+
+def tridiag_solve(a, cp, den, d, floor=None):
+	'''
+	Solve the tridiagonal system factorised by tridiag_factor. If floor is given, the solution is projected onto
+	x >= floor during the back substitution (Brennan-Schwartz), which solves the linear complementarity problem
+	of the American option when the exercise region lies at the end of the grid where the back substitution
+	starts (the last row).
+	A single system is swept row by row with Python floats, several systems (the columns of d, each with its
+	own matrix if the factorisation has columns as well) are swept together with one array operation per row.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	a: (array) the sub-diagonal (a[0] is not used)
+	cp: (array) the modified super-diagonal
+	den: (array) the pivots
+	d: (array) the right-hand side of shape (M,) or (M, K)
+	floor: (array or None) the lower bound of the solution, of the same shape as d
+	Return:
+	x: (array) the solution
+	'''
+
+	M = len(den)
+
+	if np.ndim(d) == 1:
+		a = a.tolist()
+		cp = cp.tolist()
+		den = den.tolist()
+		x = np.asarray(d, dtype=np.float64).tolist()
+
+		#Forward elimination:
+		v = x[0]/den[0]
+		x[0] = v
+		for j in range(1, M):
+			v = (x[j] - a[j]*v)/den[j]
+			x[j] = v
+
+		#Back substitution (with the projection):
+		if floor is None:
+			for j in range(M-2, -1, -1):
+				v = x[j] - cp[j]*v
+				x[j] = v
+		else:
+			floor = np.asarray(floor, dtype=np.float64).tolist()
+			v = max(v, floor[M-1])
+			x[M-1] = v
+			for j in range(M-2, -1, -1):
+				v = x[j] - cp[j]*v
+				if v < floor[j]:
+					v = floor[j]
+				x[j] = v
+
+		return np.array(x)
+
+	x = np.array(d, dtype=np.float64)
+
+	#Forward elimination:
+	x[0] /= den[0]
+	for j in range(1, M):
+		x[j] -= a[j]*x[j-1]
+		x[j] /= den[j]
+
+	#Back substitution (with the projection):
+	if floor is not None:
+		np.maximum(x[M-1], floor[M-1], out=x[M-1])
+	for j in range(M-2, -1, -1):
+		x[j] -= cp[j]*x[j+1]
+		if floor is not None:
+			np.maximum(x[j], floor[j], out=x[j])
+
+	return x
+
+
+def option_pde(X, T, r, sigma, q=0., call=True, american=True, M=400, N=200, width=5., rannacher=2):
+	'''
+	Compute the call or put option values for all the risky security prices of the grid by solving the
+	Black-Scholes equation with the Crank-Nicolson scheme on a grid uniform in ln S. The first rannacher time
+	steps are replaced by two fully implicit half steps each (Rannacher start) to damp the oscillations
+	caused by the kink of the payoff. American options are projected onto the payoff in every time step
+	(Brennan-Schwartz). The boundary conditions are the deep out-of-the-money value 0 and the deep
+	in-the-money value (the exercise value for American options, the forward value for European options).
+	A batch of contracts is solved together, each contract with its own grid (one column of S and V),
+	so that the cost of the row by row sweeps of the tridiagonal solver is shared.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	X: (float or array) strike price.
+	T: (float or array) time to expiry measured in years
+	r: (float or array) continuosly compounded risk-free interest rate
+	sigma: (float or array) volatility of the risky security
+	q: (float or array) continuously compounded dividend yield of the risky security
+	call: (bool) whether the options are calls (True) or puts (False)
+	american: (bool) whether the options can be exercised early
+	M: (int) the number of space steps (even, so that the strike lies on the grid)
+	N: (int) the number of time steps
+	width: (float) the half-width of the grid around ln X in units of sigma*sqrt(T)
+	rannacher: (int) the number of Crank-Nicolson steps replaced by implicit half steps
+	Note that X, T, r, sigma and q are broadcast against each other.
+	Return(s):
+	S: (array) the risky security prices of the grid (M+1 points, of shape (M+1,) + the shape of the batch)
+	V: (array) the option values at time 0 (use np.interp(S_0, S, V) for prices between the nodes)
+	'''
+
+	X, T, r, sigma, q = np.broadcast_arrays(*[np.asarray(v, dtype=np.float64) for v in (X, T, r, sigma, q)])
+	shape = X.shape
+	X, T, r, sigma, q = [v.ravel() for v in (X, T, r, sigma, q)]
+
+	M = M + M % 2
+	L = width*sigma*np.sqrt(T)
+	x = np.log(X) + np.linspace(-1., 1., M+1)[:, None]*L
+	S = np.exp(x)
+	h = 2.*L/M
+	dt = T/N
+
+	#Discrete operator (constant coefficients) V_tau = alpha V_{j-1} + beta V_j + gamma V_{j+1}:
+	nu = r - q - 0.5*sigma*sigma
+	alpha = 0.5*sigma*sigma/(h*h) - 0.5*nu/h
+	beta = -sigma*sigma/(h*h) - r
+	gamma = 0.5*sigma*sigma/(h*h) + 0.5*nu/h
+
+	payoff = np.maximum(S - X, 0) if call else np.maximum(X - S, 0)
+
+	def boundary(tau):
+		#The deep in-the-money value (at S[-1] for a call, at S[0] for a put):
+		if call:
+			fwd = S[-1]*np.exp(-q*tau) - X*np.exp(-r*tau)
+			return 0., np.maximum(fwd, payoff[-1]) if american else fwd
+		fwd = X*np.exp(-r*tau) - S[0]*np.exp(-q*tau)
+		return (np.maximum(fwd, payoff[0]) if american else fwd), 0.
+
+	#(I - theta dt L) V(tau + dt) = (I + (1 - theta) dt L) V(tau), the implicit half steps of the
+	#Rannacher start share the matrix of the Crank-Nicolson steps (theta dt = dt/2):
+	k = 0.5*dt
+	n_in = M - 1
+	a = np.repeat(-k*alpha[None, :], n_in, axis=0)
+	b = np.repeat(1. - k*beta[None, :], n_in, axis=0)
+	c = np.repeat(-k*gamma[None, :], n_in, axis=0)
+
+	#The exercise region of a put lies at low prices, solve the system in reversed order
+	#so that the projection is applied from that end:
+	rev = slice(None, None, -1) if not call else slice(None)
+	if not call:
+		a, c = c, a
+
+	#A single contract is solved with the scalar sweeps:
+	col = 0 if len(X) == 1 else slice(None)
+	a = a[:, col]
+	cp, den = tridiag_factor(a, b[:, col], c[:, col])
+	floor = payoff[1:-1][rev][:, col] if american else None
+
+	V = payoff.copy()
+	tau = 0.
+	steps = [0.5]*(2*min(rannacher, N)) + [1.]*(N - min(rannacher, N))
+	for s in steps:
+		tau_n = tau + s*dt
+		lo, hi = boundary(tau_n)
+		if s < 1.:
+			#Fully implicit half step:
+			d = V[1:-1].copy()
+		else:
+			#Crank-Nicolson step:
+			d = V[1:-1] + k*(alpha*V[:-2] + beta*V[1:-1] + gamma*V[2:])
+		d[0] += k*alpha*lo
+		d[-1] += k*gamma*hi
+
+		V[1:-1, col] = tridiag_solve(a, cp, den, d[rev][:, col], floor)[rev]
+		V[0] = lo
+		V[-1] = hi
+		tau = tau_n
+
+	return S.reshape((M+1,) + shape), V.reshape((M+1,) + shape)
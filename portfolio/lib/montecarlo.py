@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from . import blackscholes as bs
+
+'''
+Module Description:
+Monte Carlo Module:
+The samples are split into fixed blocks, each block draws from its own random stream spawned from
+numpy.random.SeedSequence(seed). The blocks are distributed over a pool of worker processes and the partial
+results are merged in block order, so the result is bit-identical whatever the number of workers.
+C. Wibisono
+'''
+
+def mc_blocks(sample_num, seed=None, chunk=262144):
+	'''
+	Split the samples into blocks with independent random streams.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	sample_num: (int) the number of samples
+	seed: (int or None) the seed of the random number generator (None to draw fresh entropy)
+	chunk: (int) the number of samples per block
+	Return:
+	blocks: (list of tuple) the seed sequence and the number of samples of each block
+	'''
+
+	n_block = -(-sample_num//chunk)
+	seeds = np.random.SeedSequence(seed).spawn(n_block)
+	blocks = [(seeds[b], min(chunk, sample_num - b*chunk)) for b in range(n_block)]
+
+	return blocks
+
+
+def _mc_task(task):
+	func, seed_seq, n, args = task
+	return func(seed_seq, n, *args)
+
+
+def mc_run(func, sample_num, seed=None, chunk=262144, args=(), workers=None):
+	'''
+	Evaluate func on every block of samples over a pool of worker processes.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	func: (function) a module-level function func(seed_seq, n, *args) computing the partial result of one block
+	sample_num: (int) the number of samples
+	seed: (int or None) the seed of the random number generator (None to draw fresh entropy)
+	chunk: (int) the number of samples per block
+	args: (tuple) additional arguments passed to func
+	workers: (int or None) the number of worker processes (None for all cores, 1 to run in the calling process)
+	Return:
+	res: (list) the partial results in block order
+	'''
+
+	tasks = [(func, seed_seq, n, args) for seed_seq, n in mc_blocks(sample_num, seed, chunk)]
+	if workers is None:
+		workers = os.cpu_count() or 1
+	workers = min(workers, len(tasks))
+
+	if workers <= 1:
+		return [_mc_task(task) for task in tasks]
+
+	with ProcessPoolExecutor(max_workers=workers) as ex:
+		res = list(ex.map(_mc_task, tasks, chunksize=max(1, len(tasks)//(4*workers))))
+
+	return res
+
+
+def merge_moments(mom):
+	'''
+	Merge the moments of the blocks in block order (Chan et al. pairwise update).
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	mom: (list of tuple) the number of samples, the mean and the sum of squared deviations of each block
+	Return(s):
+	n: (int) the number of samples
+	mean: (float) the sample mean
+	M2: (float) the sum of squared deviations from the sample mean
+	'''
+
+	n, mean, M2 = 0, 0., 0.
+	for n_b, mean_b, M2_b in mom:
+		if n_b == 0:
+			continue
+		tot = n + n_b
+		delta = mean_b - mean
+		mean = mean + delta*n_b/tot
+		M2 = M2 + M2_b + delta*delta*n*n_b/tot
+		n = tot
+
+	return n, mean, M2
+
+
+def risky_security_bs_sample_mp(mu, sigma, S_0, T, sample_num=1000000, seed=None, h=0.01, width=8., chunk=262144,
+	workers=None):
+	'''
+	Sample the logarithmic risky security price at time T based on the Black-Scholes Model over a pool of
+	worker processes and count the samples on a fixed grid. With the same seed and chunk the histogram
+	is identical to blackscholes.risky_security_bs_sample.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	mu: (float) expected logarithmic return of risky security per unit time
+	sigma: (float) volatility of the risky security
+	S_0 : (float) the initial price associated with the risky security
+	T: (float) time measured in years
+	sample_num: (int) the number of samples
+	seed: (int or None) the seed of the random number generator (None to draw fresh entropy)
+	h: (float) the bin width of the logarithmic price
+	width: (float) the half-width of the grid in units of the standard deviation sigma*sqrt(T)
+	chunk: (int) the number of samples per block
+	workers: (int or None) the number of worker processes (None for all cores)
+	Return(s):
+	x: (array) the logarithmic risky security prices at the bin centers
+	counts: (array of int) the number of samples in each bin
+	mean: (float) the sample mean of the logarithmic price
+	var: (float) the sample variance of the logarithmic price
+	'''
+
+	mu_b, sd, i_0, M = bs.bs_terminal_grid(mu, sigma, S_0, T, h, width)
+	res = mc_run(bs._bs_terminal_counts, sample_num, seed, chunk, (mu_b, sd, i_0, M, h, True), workers)
+
+	#Merge the partial histograms and moments in block order:
+	counts = np.zeros(M, dtype=np.int64)
+	for counts_b, mom_b in res:
+		counts += counts_b
+	n, mean, M2 = merge_moments([mom_b for counts_b, mom_b in res])
+	var = M2/(n - 1) if n > 1 else 0.
+
+	x = (i_0 + np.arange(M))*h
+
+	return x, counts, float(mean), float(var)
+
+
+def van_der_corput(i):
+	'''
+	Compute the van der Corput sequence in base 2 (the one-dimensional Sobol and Halton sequence)
+	by reversing the bits of the index.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	i: (int or array of int) the index of the points (below 2^32)
+	Return:
+	u: (array) the points in [0, 1)
+	'''
+
+	x = np.asarray(i, dtype=np.uint64) & np.uint64(0xFFFFFFFF)
+	for shift, mask in ((1, 0x55555555), (2, 0x33333333), (4, 0x0F0F0F0F), (8, 0x00FF00FF), (16, 0x0000FFFF)):
+		s, m = np.uint64(shift), np.uint64(mask)
+		x = ((x >> s) & m) | ((x & m) << s)
+	u = x.astype(np.float64)/2.**32
+
+	return u
+
+
+def _eu_mc_block(seed_seq, n, S_t, tau, r, sigma, X, call, payoff, antithetic, qmc):
+	'''
+	Price one block of the Monte Carlo estimator of a European option.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	seed_seq: (numpy SeedSequence) the seed of the block
+	n: (int) the number of samples in the block (pairs of samples if antithetic is True)
+	S_t, tau, r, sigma, X, call, payoff, antithetic, qmc: see eu_option_mc
+	Return:
+	sums: (array) n and the sums of y, y^2, c, c^2 and y c over the block, with y the discounted payoff
+	and c the discounted control (the terminal price for the european option with strike X, the european option
+	with strike X for any other payoff)
+	'''
+
+	rng = np.random.default_rng(seed_seq)
+	if qmc:
+		#Randomly shifted van der Corput points (one shift per block):
+		u = (van_der_corput(np.arange(1, n + 1)) + rng.random()) % 1.
+		z = bs.norm_ppf(np.clip(u, 2.**-53, 1. - 2.**-53))
+	else:
+		z = rng.standard_normal(n)
+
+	disc = np.exp(-r*tau)
+	drift = (r - 0.5*sigma*sigma)*tau
+	vol = sigma*np.sqrt(tau)
+
+	def sample(z):
+		S_T = S_t*np.exp(drift + vol*z)
+		v = disc*(np.maximum(S_T - X, 0) if call else np.maximum(X - S_T, 0))
+		if payoff is None:
+			return v, disc*S_T
+		return disc*payoff(S_T), v
+
+	y, c = sample(z)
+	if antithetic:
+		y_b, c_b = sample(-z)
+		y = 0.5*(y + y_b)
+		c = 0.5*(c + c_b)
+
+	sums = np.array([n, y.sum(), (y*y).sum(), c.sum(), (c*c).sum(), (y*c).sum()])
+
+	return sums
+
+
+def _eu_mc_estimate(sums, qmc, C_bs):
+	'''
+	Compute the Monte Carlo estimate and its standard error from the sums of the blocks.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	sums: (2D array) the sums of each block (see _eu_mc_block)
+	qmc: (bool) whether the blocks are independent randomizations of a quasi-random point set
+	C_bs: (float or None) the exact mean of the discounted control (None without control variate)
+	Return(s):
+	V: (float) the estimate of the option price
+	se: (float) the standard error of the estimate
+	'''
+
+	n, Sy, Syy, Sc, Scc, Syc = sums.sum(axis=0)
+	y_m, c_m = Sy/n, Sc/n
+	var_y = (Syy - n*y_m*y_m)/max(n - 1, 1)
+	var_c = (Scc - n*c_m*c_m)/max(n - 1, 1)
+	cov = (Syc - n*y_m*c_m)/max(n - 1, 1)
+
+	#Compute the control variate coefficient:
+	beta = cov/var_c if C_bs is not None and var_c > 0 else 0.
+	C_bs = 0. if C_bs is None else C_bs
+
+	if not qmc:
+		V = y_m - beta*(c_m - C_bs)
+		se = np.sqrt(max(var_y - beta*cov, 0.)/n)
+		return float(V), float(se)
+
+	#The blocks are independent replications, the error is estimated from their spread:
+	n_b = sums[:, 0]
+	v_b = sums[:, 1]/n_b - beta*(sums[:, 3]/n_b - C_bs)
+	V = (n_b*v_b).sum()/n
+	if len(v_b) < 2:
+		return float(V), float('nan')
+	se = np.sqrt((n_b*(v_b - V)**2).sum()/n/(len(v_b) - 1))
+
+	return float(V), float(se)
+
+
+def eu_option_mc(S_t, t, T, r, sigma, X, call=True, payoff=None, sample_num=1000000, seed=None, chunk=65536,
+	antithetic=True, control=True, qmc=False, se_target=None, level=0.95, workers=1):
+	'''
+	Compute the price of a European option by Monte Carlo simulation of the terminal risky security price
+	under the risk-neutral Black-Scholes Model, S(T) = S(t) exp((r - sigma^2/2)(T-t) + sigma W(T-t)).
+	Variance reduction:
+	antithetic: each normal draw z is paired with -z.
+	control: the discounted payoff of the European call (put) with strike X is used as a control variate for
+	the payoff, its exact price being blackscholes.eu_option_bs. For the European call (put) itself (payoff None)
+	the discounted terminal price is used instead, its exact mean being S(t). The coefficient is estimated
+	from the samples.
+	qmc: every block of chunk samples is a randomly shifted van der Corput (1-D Sobol/Halton) point set,
+	the standard error is estimated from the spread between the blocks.
+	The blocks are processed in order and the simulation stops as soon as the standard error is below se_target.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	S_t: (float) the risky security price at time t
+	t: (float) the present time in which the asset is evaluated
+	T: (float) exercised time.
+	r: (float) continuosly compounded risk-free interest rate
+	sigma: (float) volatility of the risky security
+	X: (float) strike price.
+	call: (bool) whether the option (and the control) is a call (True) or a put (False)
+	payoff: (function or None) payoff(S_T) of the terminal prices (array), None for the call (put) with strike X
+	sample_num: (int) the maximum number of samples (pairs of samples if antithetic is True)
+	seed: (int or None) the seed of the random number generator (None to draw fresh entropy)
+	chunk: (int) the number of samples per block
+	antithetic: (bool) whether to use antithetic variates
+	control: (bool) whether to use the control variate
+	qmc: (bool) whether to use randomized quasi-random numbers
+	se_target: (float or None) the target standard error (None to use all the samples)
+	level: (float) the confidence level of the interval
+	workers: (int or None) the number of worker processes (only used without se_target, None for all cores)
+	Return(s):
+	V: (float) the estimate of the option price
+	se: (float) the standard error of the estimate
+	ci: (tuple) the confidence interval at the given level
+	n: (int) the number of samples used (pairs of samples if antithetic is True)
+	'''
+
+	tau = T - t
+	args = (S_t, tau, r, sigma, X, call, payoff, antithetic, qmc)
+
+	C_bs = None
+	if control and payoff is None:
+		C_bs = float(S_t)
+	elif control:
+		C_E, P_E = bs.eu_option_bs_batch(S_t, t, T, r, sigma, X)
+		C_bs = float(C_E if call else P_E)
+
+	if se_target is None:
+		sums = np.array(mc_run(_eu_mc_block, sample_num, seed, chunk, args, workers))
+		V, se = _eu_mc_estimate(sums, qmc, C_bs)
+	else:
+		#Add the blocks one by one until the target standard error is reached:
+		sums = []
+		for seed_seq, n in mc_blocks(sample_num, seed, chunk):
+			sums.append(_eu_mc_block(seed_seq, n, *args))
+			V, se = _eu_mc_estimate(np.array(sums), qmc, C_bs)
+			if se <= se_target:
+				break
+		sums = np.array(sums)
+
+	z = float(bs.norm_ppf(0.5 + 0.5*level))
+	ci = (V - z*se, V + z*se)
+
+	return V, se, ci, int(sums[:, 0].sum())
+
+
+def gbm_path_stats(rng, n, S_t, tau, r, sigma, steps, step_block=64, up=None, down=None, antithetic=False):
+	'''
+	Simulate n paths of the risky security price under the risk-neutral Black-Scholes Model on steps
+	equally spaced monitoring dates and accumulate the path statistics. The time steps are generated in
+	blocks of step_block steps, so the memory is n*step_block floats and the path matrix is never stored.
+	The normal draws are taken in time order, hence the paths do not depend on step_block (only the rounding
+	of the running sums does).
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	rng: (numpy Generator) the random number generator
+	n: (int) the number of paths
+	S_t: (float) the risky security price at time t
+	tau: (float) the time to expiry T-t
+	r: (float) continuosly compounded risk-free interest rate
+	sigma: (float) volatility of the risky security
+	steps: (int) the number of monitoring dates (the last one at T)
+	step_block: (int) the number of time steps generated at once
+	up: (float or None) the upper barrier monitored on the dates
+	down: (float or None) the lower barrier monitored on the dates
+	antithetic: (bool) whether the second half of the paths mirrors the normal draws of the first half (n even)
+	Return:
+	stats: (dict of array) for each path, 'S_T' the terminal price, 'avg' the arithmetic average and
+	'geo' the geometric average over the monitoring dates, 'max' and 'min' the extrema over the monitoring
+	dates and t, 'hit_up' and 'hit_down' whether the barriers were touched
+	'''
+
+	dt = tau/steps
+	drift = (r - 0.5*sigma*sigma)*dt
+	vol = sigma*np.sqrt(dt)
+
+	#Running statistics of the paths (in logarithmic price):
+	x = np.full(n, np.log(S_t))
+	s_avg = np.zeros(n)
+	s_geo = np.zeros(n)
+	x_max = x.copy()
+	x_min = x.copy()
+
+	for i in range(0, steps, step_block):
+		m = min(step_block, steps - i)
+		if antithetic:
+			temp = rng.standard_normal((m, n//2))
+			temp = np.concatenate([temp, -temp], axis=1)
+		else:
+			temp = rng.standard_normal((m, n))
+		temp *= vol
+		temp += drift
+		temp[0] += x
+		np.cumsum(temp, axis=0, out=temp)
+
+		x = temp[-1].copy()
+		s_geo += temp.sum(axis=0)
+		np.maximum(x_max, temp.max(axis=0), out=x_max)
+		np.minimum(x_min, temp.min(axis=0), out=x_min)
+		np.exp(temp, out=temp)
+		s_avg += temp.sum(axis=0)
+
+	stats = {'S_T': np.exp(x), 'avg': s_avg/steps, 'geo': np.exp(s_geo/steps), 'max': np.exp(x_max),
+		'min': np.exp(x_min)}
+	stats['hit_up'] = np.zeros(n, dtype=bool) if up is None else stats['max'] >= up
+	stats['hit_down'] = np.zeros(n, dtype=bool) if down is None else stats['min'] <= down
+
+	return stats
+
+
+def asian_payoff(stats, X, call=True, geometric=False):
+	'''
+	Payoff of the (fixed strike) Asian option on the average price.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	stats: (dict of array) the path statistics (see gbm_path_stats)
+	X: (float) strike price.
+	call: (bool) whether the option is a call (True) or a put (False)
+	geometric: (bool) whether to use the geometric instead of the arithmetic average
+	Return:
+	val: (array) the payoff of each path
+	'''
+
+	A = stats['geo'] if geometric else stats['avg']
+	return np.maximum(A - X, 0) if call else np.maximum(X - A, 0)
+
+
+def barrier_payoff(stats, X, call=True, knock_in=False):
+	'''
+	Payoff of the barrier option, knocked out (or in) when a barrier passed to gbm_path_stats is touched.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	stats: (dict of array) the path statistics (see gbm_path_stats)
+	X: (float) strike price.
+	call: (bool) whether the option is a call (True) or a put (False)
+	knock_in: (bool) whether the option is knocked in (True) or knocked out (False) by the barriers
+	Return:
+	val: (array) the payoff of each path
+	'''
+
+	S_T = stats['S_T']
+	val = np.maximum(S_T - X, 0) if call else np.maximum(X - S_T, 0)
+	hit = stats['hit_up'] | stats['hit_down']
+	return np.where(hit == knock_in, val, 0.)
+
+
+def lookback_payoff(stats, call=True):
+	'''
+	Payoff of the floating strike lookback option: S(T) - min S for a call, max S - S(T) for a put.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	stats: (dict of array) the path statistics (see gbm_path_stats)
+	call: (bool) whether the option is a call (True) or a put (False)
+	Return:
+	val: (array) the payoff of each path
+	'''
+
+	return stats['S_T'] - stats['min'] if call else stats['max'] - stats['S_T']
+
+
+def _path_mc_block(seed_seq, n, S_t, tau, r, sigma, payoff, payoff_args, steps, step_block, up, down, antithetic):
+	'''
+	Price one block of the Monte Carlo estimator of a path-dependent option.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	seed_seq: (numpy SeedSequence) the seed of the block
+	n: (int) the number of paths in the block (pairs of paths if antithetic is True)
+	S_t, tau, r, sigma, payoff, payoff_args, steps, step_block, up, down, antithetic: see path_option_mc
+	Return:
+	sums: (array) n and the sums of y and y^2 over the block, with y the discounted payoff
+	'''
+
+	rng = np.random.default_rng(seed_seq)
+	m = 2*n if antithetic else n
+	stats = gbm_path_stats(rng, m, S_t, tau, r, sigma, steps, step_block, up, down, antithetic)
+	y = np.exp(-r*tau)*payoff(stats, *payoff_args)
+	if antithetic:
+		y = 0.5*(y[:n] + y[n:])
+
+	sums = np.array([n, y.sum(), (y*y).sum()])
+
+	return sums
+
+
+def path_option_mc(S_t, t, T, r, sigma, payoff, payoff_args=(), steps=252, sample_num=100000, seed=None,
+	chunk=8192, step_block=64, up=None, down=None, antithetic=True, se_target=None, level=0.95, workers=1):
+	'''
+	Compute the price of a path-dependent European option (Asian, barrier, lookback) by Monte Carlo simulation
+	of the risky security price under the risk-neutral Black-Scholes Model. The paths are simulated in blocks of
+	chunk paths, each block streaming its time steps (see gbm_path_stats), so the memory is bounded by
+	chunk*step_block floats per worker whatever the number of paths and time steps.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	S_t: (float) the risky security price at time t
+	t: (float) the present time in which the asset is evaluated
+	T: (float) exercised time.
+	r: (float) continuosly compounded risk-free interest rate
+	sigma: (float) volatility of the risky security
+	payoff: (function) payoff(stats, *payoff_args) of the path statistics, e.g. asian_payoff, barrier_payoff or
+	lookback_payoff (a module-level function or a functools.partial object if workers is not 1)
+	payoff_args: (tuple) additional arguments passed to payoff
+	steps: (int) the number of monitoring dates
+	sample_num: (int) the maximum number of paths (pairs of paths if antithetic is True)
+	seed: (int or None) the seed of the random number generator (None to draw fresh entropy)
+	chunk: (int) the number of paths per block
+	step_block: (int) the number of time steps generated at once
+	up: (float or None) the upper barrier monitored on the dates
+	down: (float or None) the lower barrier monitored on the dates
+	antithetic: (bool) whether to use antithetic paths
+	se_target: (float or None) the target standard error (None to use all the paths)
+	level: (float) the confidence level of the interval
+	workers: (int or None) the number of worker processes (only used without se_target, None for all cores)
+	Return(s):
+	V: (float) the estimate of the option price
+	se: (float) the standard error of the estimate
+	ci: (tuple) the confidence interval at the given level
+	n: (int) the number of paths used (pairs of paths if antithetic is True)
+	'''
+
+	args = (S_t, T - t, r, sigma, payoff, tuple(payoff_args), steps, step_block, up, down, antithetic)
+
+	if se_target is None:
+		sums = np.array(mc_run(_path_mc_block, sample_num, seed, chunk, args, workers))
+	else:
+		#Add the blocks one by one until the target standard error is reached:
+		sums = []
+		for seed_seq, n in mc_blocks(sample_num, seed, chunk):
+			sums.append(_path_mc_block(seed_seq, n, *args))
+			n, Sy, Syy = np.sum(sums, axis=0)
+			if n > 1 and np.sqrt(max(Syy - Sy*Sy/n, 0.)/(n - 1)/n) <= se_target:
+				break
+		sums = np.array(sums)
+
+	n, Sy, Syy = sums.sum(axis=0)
+	V = Sy/n
+	se = np.sqrt(max(Syy - n*V*V, 0.)/max(n - 1, 1)/n)
+	z = float(bs.norm_ppf(0.5 + 0.5*level))
+
+	return float(V), float(se), (float(V - z*se), float(V + z*se)), int(n)
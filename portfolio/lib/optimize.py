@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+import collections
+import hashlib
 import numpy as np
 
 '''
@@ -13,24 +15,157 @@ def cov_construct(rho, sigma):
 	'''
 	Construct Covariant Matrix between a pair of securities
 	Function Argument(s):
-	rho: list(2D arr) correlation between returns
-	sigma: risk for each return
+	rho: (2D array) correlation between returns
+	sigma: (1D array) risk for each return
 	Return:
-	C: list(2D arr) covariant matrix between returns
+	C: (2D array) covariant matrix between returns
 	'''
-	dim = len(sigma)
-	C = []
-	for k1 in range(dim):
-		C.append([])
-		for k2 in range(dim):
-			C[k1].append(0)
 
-	for k1 in range(dim):
-		for k2 in range(dim):
-			C[k1][k2] = rho[k1][k2]*sigma[k1]*sigma[k2]
+	rho = np.asarray(rho, dtype=np.float64)
+	sigma = np.asarray(sigma, dtype=np.float64)
+	C = rho*np.outer(sigma, sigma)
 
 	return C
 
+class CovEstimator:
+	'''
+	Create a streaming estimator of the expected returns and of the covariance matrix from return histories,
+	consuming one row (returns of the n securities at one time) or a chunk of rows at a time. Only the weighted
+	count W, the mean and the scatter matrix S are kept (Welford/Chan updates, merging the mean and scatter of
+	each chunk), so the memory does not depend on the length of the history and an update costs O(n^2) per row.
+	halflife: exponentially weighted estimates, the weight of a row halves after halflife newer rows.
+	window: estimates over the last window rows only (the rows are kept in a ring buffer and removed with the
+	reverse update, the statistics are recomputed from the buffer every window rows to avoid the drift).
+	The estimates m, sigma, rho and C are the inputs of cov_construct and of the optimize functions.
+	'''
+
+	def __init__(self, n, halflife=None, window=None):
+		'''
+		Instantiate an estimator for n securities
+		'''
+		if halflife is not None and window is not None:
+			raise ValueError("halflife and window cannot be used together")
+		self.n = n
+		self.lam = 1. if halflife is None else 0.5**(1./halflife)
+		self.window = window
+		self.count = 0
+		self.W = 0.
+		self.W2 = 0.
+		self.m = np.zeros(n)
+		self.S = np.zeros((n, n))
+		if window is not None:
+			self._buf = np.zeros((window, n))
+			self._pos = 0
+			self._since = 0
+
+	def _merge(self, W_b, W2_b, m_b, S_b, sign=1.):
+		#Merge (sign = 1) or remove (sign = -1) a set of rows with weight W_b, mean m_b and scatter S_b:
+		W = self.W + sign*W_b
+		if W <= 0:
+			self.W, self.W2, self.m, self.S = 0., 0., np.zeros(self.n), np.zeros((self.n, self.n))
+			return
+		if sign > 0:
+			delta = m_b - self.m
+			self.m = self.m + delta*(W_b/W)
+			self.S = self.S + S_b + np.outer(delta, delta)*(self.W*W_b/W)
+		else:
+			m_a = (self.W*self.m - W_b*m_b)/W
+			delta = m_b - m_a
+			self.S = self.S - S_b - np.outer(delta, delta)*(W*W_b/self.W)
+			self.m = m_a
+		self.W = W
+		self.W2 = self.W2 + sign*W2_b
+
+	@staticmethod
+	def _chunk_stats(X, w=None):
+		#Weight, squared weight, mean and scatter of the rows of X (with the row weights w):
+		if w is None:
+			m_b = X.mean(axis=0)
+			D = X - m_b
+			return float(len(X)), float(len(X)), m_b, D.T @ D
+		W_b = w.sum()
+		m_b = (w @ X)/W_b
+		D = X - m_b
+		return W_b, float(w @ w), m_b, (D*w[:, None]).T @ D
+
+	def update(self, X):
+		'''
+		Consume the returns X of shape (n,) (one row) or (k, n) (a chunk of k rows, oldest first)
+		'''
+		X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+		if X.shape[1] != self.n:
+			raise ValueError("the rows must hold the returns of "+str(self.n)+" securities")
+		k = len(X)
+		if k == 0:
+			return self
+
+		if self.window is not None:
+			if k > self.window:
+				X = X[-self.window:]
+				k = self.window
+			#Rows leaving the window:
+			n_out = max(0, min(self.count, self.window) + k - self.window)
+			if n_out:
+				start = (self._pos - min(self.count, self.window)) % self.window
+				idx = (start + np.arange(n_out)) % self.window
+				self._merge(*self._chunk_stats(self._buf[idx]), sign=-1.)
+			idx = (self._pos + np.arange(k)) % self.window
+			self._buf[idx] = X
+			self._pos = (self._pos + k) % self.window
+			self._merge(*self._chunk_stats(X))
+			self.count += k
+			self._since += k
+			if self._since >= self.window:
+				#Recompute the statistics of the window from the buffer:
+				self._since = 0
+				n_in = min(self.count, self.window)
+				idx = (self._pos - n_in + np.arange(n_in)) % self.window
+				self.W, self.W2, self.m, self.S = self._chunk_stats(self._buf[idx])
+			return self
+
+		if self.lam < 1.:
+			#Decay the weights of the previous rows and weigh the rows of the chunk:
+			w = self.lam**np.arange(k-1, -1, -1, dtype=np.float64)
+			self.W *= self.lam**k
+			self.W2 *= self.lam**(2*k)
+			self.S *= self.lam**k
+			self._merge(*self._chunk_stats(X, w))
+		else:
+			self._merge(*self._chunk_stats(X))
+		self.count += k
+
+		return self
+
+	def mean(self):
+		'''
+		Return the expected returns m
+		'''
+		return self.m.copy()
+
+	def cov(self, ddof=1):
+		'''
+		Return the covariance matrix C (ddof = 1 for the unbiased estimate with reliability weights, 0 for S/W)
+		'''
+		denum = self.W - ddof*self.W2/self.W if self.W > 0 else 0.
+		if denum <= 0:
+			return np.full((self.n, self.n), np.nan)
+		return self.S/denum
+
+	def std(self, ddof=1):
+		'''
+		Return the risks sigma
+		'''
+		return np.sqrt(np.maximum(np.diag(self.cov(ddof)), 0.))
+
+	def corr(self):
+		'''
+		Return the correlation matrix rho
+		'''
+		sigma = self.std()
+		with np.errstate(divide='ignore', invalid='ignore'):
+			return self.cov()/np.outer(sigma, sigma)
+
+
 def matinv(C):
 	mat = np.array(C)
 	#det = np.linalg.det(mat)
@@ -38,33 +173,274 @@ def matinv(C):
 	return mat_inv
 
 
+def cov_factor(C):
+	'''
+	Factorise the covariance matrix once as C = L diag(d) L^T, so that the portfolio weights are obtained
+	with triangular solves instead of the inverse. The Cholesky factorisation is used when C is positive definite
+	(d is None), otherwise the LDL^T factorisation, in which the pivots below the rounding level of C
+	(singular covariance matrix, e.g. estimated from fewer observations than securities) are set to zero and
+	skipped by cov_solve.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	C: (2D array) covariance matrix between returns
+	Return(s):
+	L: (2D array) the lower triangular factor
+	d: (1D array or None) the pivots of the LDL^T factorisation (None for the Cholesky factorisation)
+	'''
+
+	C = np.asarray(C, dtype=np.float64)
+	try:
+		return np.linalg.cholesky(C), None
+	except np.linalg.LinAlgError:
+		pass
+
+	#LDL^T factorisation column by column:
+	n = len(C)
+	L = np.eye(n)
+	d = np.zeros(n)
+	tol = n*np.finfo(np.float64).eps*np.abs(np.diag(C)).max()
+	for j in range(n):
+		Ld = L[j, :j]*d[:j]
+		d[j] = C[j, j] - L[j, :j] @ Ld
+		if abs(d[j]) <= tol:
+			d[j] = 0.
+			continue
+		L[j+1:, j] = (C[j+1:, j] - L[j+1:, :j] @ Ld)/d[j]
+
+	return L, d
+
+
+def tri_solve(L, B, trans=False, nb=128):
+	'''
+	Solve L X = B (or L^T X = B) for a lower triangular L by blocks of nb rows, the update of the remaining
+	rows being a single matrix product per block.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	L: (2D array) the lower triangular matrix
+	B: (1D or 2D array) the right-hand side(s)
+	trans: (bool) whether to solve with the transpose of L
+	nb: (int) the block size
+	Return:
+	X: (1D or 2D array) the solution
+	'''
+
+	X = np.array(B, dtype=np.float64)
+	n = len(L)
+	if not trans:
+		for i0 in range(0, n, nb):
+			i1 = min(i0 + nb, n)
+			X[i0:i1] = np.linalg.solve(L[i0:i1, i0:i1], X[i0:i1])
+			X[i1:] -= L[i1:, i0:i1] @ X[i0:i1]
+	else:
+		for i1 in range(n, 0, -nb):
+			i0 = max(i1 - nb, 0)
+			X[i0:i1] = np.linalg.solve(L[i0:i1, i0:i1].T, X[i0:i1])
+			X[:i0] -= L[i0:i1, :i0].T @ X[i0:i1]
+
+	return X
+
+
+def cov_solve(fac, B):
+	'''
+	Compute C^-1 B from the factorisation of the covariance matrix. The zero pivots of a singular
+	covariance matrix are skipped, which still gives a solution of C X = B whenever B lies in the range of C.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	fac: (tuple) the factorisation (L, d) returned by cov_factor
+	B: (1D or 2D array) the right-hand side(s)
+	Return:
+	X: (1D or 2D array) C^-1 B
+	'''
+
+	L, d = fac
+	Y = tri_solve(L, B)
+	if d is not None:
+		inv_d = np.zeros(len(d))
+		inv_d[d != 0] = 1./d[d != 0]
+		Y = Y*(inv_d if Y.ndim == 1 else inv_d[:, None])
+
+	return tri_solve(L, Y, trans=True)
+
+
+class PreparedCovariance:
+	'''
+	Create a prepared covariance object holding the factorisation of the covariance matrix (see cov_factor)
+	together with uC^-1, so that repeated optimisations on the same covariance matrix do not factorise it again.
+	The terms depending on the expected returns (mC^-1 and the matrix M of the minimum variance line) are
+	computed on first use and kept for the last few return vectors.
+	All optimize entry points accept either a covariance matrix or a PreparedCovariance object.
+	'''
+
+	def __init__(self, C, m_cache=8):
+		'''
+		Instantiate the prepared covariance from the covariance matrix C (copied and made read-only)
+		'''
+		self.C = np.array(C, dtype=np.float64)
+		self.C.flags.writeable = False
+		self.fac = cov_factor(self.C)
+		self.uCinv = cov_solve(self.fac, np.ones(len(self.C)))
+		self.m_cache = m_cache
+		self._terms = collections.OrderedDict()
+
+	def __len__(self):
+		return len(self.C)
+
+	@property
+	def nbytes(self):
+		'''
+		The memory held by the covariance matrix, its factorisation and uC^-1 (in bytes)
+		'''
+		L, d = self.fac
+		return self.C.nbytes + L.nbytes + (0 if d is None else d.nbytes) + self.uCinv.nbytes
+
+	def solve(self, B):
+		'''
+		Compute C^-1 B
+		'''
+		return cov_solve(self.fac, B)
+
+	def terms(self, m):
+		'''
+		Return mC^-1, uC^-1 and the matrix M = [[mC^-1m^T, uC^-1m^T], [mC^-1u^T, uC^-1u^T]] for the expected returns m
+		'''
+		m = np.asarray(m, dtype=np.float64)
+		key = m.tobytes()
+		if key in self._terms:
+			self._terms.move_to_end(key)
+			return self._terms[key]
+
+		mCinv = self.solve(m)
+		mu = np.stack([m, np.ones(len(m))], axis=1)
+		M = mu.T @ np.stack([mCinv, self.uCinv], axis=1)
+		self._terms[key] = (mCinv, self.uCinv, M)
+		if len(self._terms) > self.m_cache:
+			self._terms.popitem(last=False)
+
+		return self._terms[key]
+
+
+_COV_CACHE = collections.OrderedDict()
+_COV_CACHE_INFO = {'hits': 0, 'misses': 0, 'maxsize': 8, 'maxbytes': 256*2**20, 'bytes': 0}
+
+def prepare_cov(C):
+	'''
+	Return the prepared covariance of C from a least recently used cache keyed by a hash of the content of C
+	(shape and values), so that the same covariance matrix is only factorised once whichever array holds it.
+	The cache keeps at most maxsize entries holding at most maxbytes in total (about 2 n^2 doubles per entry for n
+	securities, see cov_cache_clear), the least recently used ones are evicted first. A covariance matrix whose
+	prepared covariance alone exceeds maxbytes is factorised but not cached.
+	Hashing reads the whole matrix (about 0.06 s for 3000 securities), pass the PreparedCovariance object itself
+	to the optimize functions in tight loops.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	C: (2D array or PreparedCovariance) covariance matrix between returns
+	Return:
+	prep: (PreparedCovariance) the prepared covariance (C itself if already prepared)
+	'''
+
+	if isinstance(C, PreparedCovariance):
+		return C
+
+	C = np.ascontiguousarray(C, dtype=np.float64)
+	h = hashlib.sha256(str(C.shape).encode())
+	h.update(memoryview(C).cast('B'))
+	key = h.digest()
+
+	if key in _COV_CACHE:
+		_COV_CACHE_INFO['hits'] += 1
+		_COV_CACHE.move_to_end(key)
+		return _COV_CACHE[key]
+
+	_COV_CACHE_INFO['misses'] += 1
+	prep = PreparedCovariance(C)
+	size = prep.nbytes
+	if _COV_CACHE_INFO['maxsize'] <= 0 or size > _COV_CACHE_INFO['maxbytes']:
+		return prep
+
+	_COV_CACHE[key] = prep
+	_COV_CACHE_INFO['bytes'] += size
+	while len(_COV_CACHE) > _COV_CACHE_INFO['maxsize'] or _COV_CACHE_INFO['bytes'] > _COV_CACHE_INFO['maxbytes']:
+		_COV_CACHE_INFO['bytes'] -= _COV_CACHE.popitem(last=False)[1].nbytes
+
+	return prep
+
+def cov_cache_info():
+	'''
+	Statistics of the prepared covariance cache.
+	C. Wibisono
+	10/17 '26
+	Return:
+	info: (dict) the number of hits and misses, the number of entries (size), the maximum number of entries (maxsize),
+	the memory held by the entries (bytes) and its maximum (maxbytes)
+	'''
+
+	info = dict(_COV_CACHE_INFO)
+	info['size'] = len(_COV_CACHE)
+	return info
+
+def cov_cache_clear(maxsize=None, maxbytes=None):
+	'''
+	Empty the prepared covariance cache and reset its statistics.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	maxsize: (int or None) the new maximum number of entries (None to keep the current one, 0 disables the cache)
+	maxbytes: (int or None) the new maximum memory held by the entries in bytes (None to keep the current one)
+	'''
+
+	_COV_CACHE.clear()
+	_COV_CACHE_INFO['hits'] = 0
+	_COV_CACHE_INFO['misses'] = 0
+	_COV_CACHE_INFO['bytes'] = 0
+	if maxsize is not None:
+		_COV_CACHE_INFO['maxsize'] = maxsize
+	if maxbytes is not None:
+		_COV_CACHE_INFO['maxbytes'] = maxbytes
+
+
+def _cov_matrix(C):
+	#The covariance matrix itself (value does not need the factorisation):
+	if isinstance(C, PreparedCovariance):
+		return C.C
+	return np.asarray(C, dtype=np.float64)
+
+
+def _frontier_terms(m, C):
+	'''
+	Compute mC^-1, uC^-1 and the matrix M = [[mC^-1m^T, uC^-1m^T], [mC^-1u^T, uC^-1u^T]] from the
+	prepared covariance of C (see prepare_cov).
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	m: (1D array) expected return for each security
+	C: (2D array or PreparedCovariance) covariance matrix between a pair of securities
+	Return(s):
+	mCinv: (1D array) mC^-1
+	uCinv: (1D array) uC^-1
+	M: (2D array) the 2x2 matrix of the minimum variance line
+	'''
+
+	return prepare_cov(C).terms(m)
+
+
 def mvp(C):
 	'''
 	Minimum Variance Portfolio:
 	C. Wibisono
 	04/29 '25
 	Function Argument(s):
-	C: covariance matrix between returns
+	C: (2D array or PreparedCovariance) covariance matrix between returns
 	Return:
-	w: arr(1D returns of portfolio weight)
-	'''
-	Cinv = matinv(C)
-	dim = len(Cinv)
-	u = []
-	temp_a = [] #uC^-1
-	for k in range(dim):
-		u.append(1)
-		temp_a.append(0)
-	
-	denum = 0 #uC^-1u^T
-	for k0 in range(dim):
-		for k1 in range(dim):
-			temp_a[k0] = temp_a[k0] + (u[k1])*(Cinv[k1][k0])		
-		denum = denum + temp_a[k0]
+	w: (1D array) returns of portfolio weight
+	'''
 
-	weight_mvp = []
-	for k3 in range(dim):
-		weight_mvp.append(temp_a[k3]/denum)
+	temp_a = prepare_cov(C).uCinv #uC^-1
+	denum = temp_a.sum() #uC^-1u^T
+	weight_mvp = temp_a/denum
 
 	return weight_mvp
 
@@ -74,30 +450,20 @@ def value(m,C,w):
 	C. Wibisono
 	04/29 '25
 	Function Argument(s):
-	m: list (1D arr of expected returns for each security)
-	C: list (2D arr consisting of covariance matrix between a pair of securities)
+	m: (1D array) expected returns for each security
+	C: (2D array or PreparedCovariance) covariance matrix between a pair of securities
 	w: weight of each portfolio
 	Return(s):
 	mu_v: (float) expected_return
 	sigma_v: (float) risk
 	'''
 
-	dim = len(m)
-	mu_v = 0
-	sigma_v = 0
-	for k in range(dim):
-		mu_v = mu_v + m[k]*w[k]
-
-	wC = []
-	for k in range(dim):
-		wC.append(0)
+	m = np.asarray(m, dtype=np.float64)
+	C = _cov_matrix(C)
+	w = np.asarray(w, dtype=np.float64)
 
-	for k0 in range(dim):
-		for k1 in range(dim):
-			wC[k0] = wC[k0] +(w[k1]*(C[k1][k0]))
-		sigma_v = sigma_v + wC[k0]*w[k0]
-
-	sigma_v = (sigma_v)**0.5
+	mu_v = float(m @ w)
+	sigma_v = max(float(w @ (C @ w)), 0.)**0.5
 
 	return mu_v, sigma_v
 
@@ -107,47 +473,19 @@ def eff_frontier(m,C,mu_v):
 	C. Wibisono
 	04/29 '25
 	Function Argument(s):
-	m: list (1D arr of expected return for each security)
-	C: list (2D arr consisting of covariance matrix between a pair of securities)
+	m: (1D array) expected return for each security
+	C: (2D array or PreparedCovariance) covariance matrix between a pair of securities
 	mu_v: (float) expected return
 	Return(s):
-	w_eff: weight associated with the minimum variance line
+	w_eff: (1D array) weight associated with the minimum variance line
 	sigma_v: the lowest risk for a given expected return mu_v
 	'''
-	M=[[0,0],[0,0]]
-	Cinv = matinv(C)
-	dim = len(m)
-	u = []
-	w_eff = []
-	mCinv = []
-	uCinv = []
-	for q in range(dim):
-		u.append(1)
-		mCinv.append(0)
-		uCinv.append(0)
-
-	for k0 in range(dim):
-		for k1 in range(dim):
-			mCinv[k0] = mCinv[k0] + (m[k1]*Cinv[k1][k0])
-			uCinv[k0] = uCinv[k0] + (u[k1]*Cinv[k1][k0])
-
-		M[0][0] = M[0][0] + mCinv[k0]*m[k0]
-		M[0][1] = M[0][1] + uCinv[k0]*m[k0]
-		M[1][0] = M[1][0] + mCinv[k0]*u[k0]
-		M[1][1] = M[1][1] + uCinv[k0]*u[k0]
-
-	Minv = matinv(M)
-	tempb = [mu_v, 1]
-
-	mult_lambda =[0,0]
-	for k0 in range(2):
-		for k1 in range(2):
-			mult_lambda[k0] = mult_lambda[k0] +(2*Minv[k0][k1]*tempb[k1])  						
-	
-	for k in range(dim):
-		temp = 0.5*(mult_lambda[0]*mCinv[k] + mult_lambda[1]*uCinv[k])
-		w_eff.append(temp)
 
+	mCinv, uCinv, M = _frontier_terms(m, C)
+
+	#Lagrange multipliers:
+	mult_lambda = 2*np.linalg.solve(M, [mu_v, 1.])
+	w_eff = 0.5*(mult_lambda[0]*mCinv + mult_lambda[1]*uCinv)
 
 	mu_b, sigma_v = value(m,C,w_eff)
 
@@ -160,89 +498,309 @@ def eff_frontier_vector(m,C):
 	C. Wibisono
 	04/29 '25
 	Function Argument(s):
-	m: list (1D arr of expected return for each security)
-	C: list (2D arr consisting of covariance matrix between a pair of securities)
+	m: (1D array) expected return for each security
+	C: (2D array or PreparedCovariance) covariance matrix between a pair of securities
 	Return(s):
-	a: list (1D arr)
-	b: list (1D arr)
-	'''
-	M=[[0,0],[0,0]]
-	Cinv = matinv(C)
-	dim = len(m)
-	u = []
-	w_eff = []
-	mCinv = []
-	uCinv = []
-	for q in range(dim):
-		u.append(1)
-		mCinv.append(0)
-		uCinv.append(0)
-
-	for k0 in range(dim):
-		for k1 in range(dim):
-			mCinv[k0] = mCinv[k0] + (m[k1]*Cinv[k1][k0])
-			uCinv[k0] = uCinv[k0] + (u[k1]*Cinv[k1][k0])
-
-		M[0][0] = M[0][0] + mCinv[k0]*m[k0]
-		M[0][1] = M[0][1] + uCinv[k0]*m[k0]
-		M[1][0] = M[1][0] + mCinv[k0]*u[k0]
-		M[1][1] = M[1][1] + uCinv[k0]*u[k0]
-
-	Minv = matinv(M)
-
-
-	a = []
-	b = []
-	for k in range(dim):
-		temp_a = Minv[0][0]*mCinv[k] + Minv[1][0]*uCinv[k]
-		temp_b = Minv[0][1]*mCinv[k] + Minv[1][1]*uCinv[k]
-		a.append(temp_a)
-		b.append(temp_b)	
+	a: (1D array)
+	b: (1D array)
+	'''
+
+	mCinv, uCinv, M = _frontier_terms(m, C)
+	Minv = np.linalg.inv(M)
+
+	a = Minv[0][0]*mCinv + Minv[1][0]*uCinv
+	b = Minv[0][1]*mCinv + Minv[1][1]*uCinv
 
 	return a, b
 
 
+def eff_frontier_batch(m, C, mu_v=None, sigma_v=None, R=None, weights=True):
+	'''
+	Compute the minimum variance line for a whole array of expected returns (or of risks) in one call.
+	C is factorised once for the vectors a, b and the matrix M (see eff_frontier_vector), then
+	w(mu) = mu a + b and sigma(mu)^2 = [mu, 1] M^-1 [mu, 1]^T in closed form.
+	For target risks the expected return of the efficient (upper) part of the line is used,
+	mu = (B + sqrt(D (U sigma^2 - 1)))/U with B = uC^-1m^T, U = uC^-1u^T and D = det(M),
+	the risks below the risk of the minimum variance portfolio 1/sqrt(U) give nan.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	m: (1D array) expected return for each security
+	C: (2D array or PreparedCovariance) covariance matrix between a pair of securities
+	mu_v: (1D array) expected returns along the minimum variance line
+	sigma_v: (1D array) risks along the efficient frontier (used if mu_v is None)
+	R: (float or None) return of a risk-free security, to find the point with the highest Sharpe ratio
+	weights: (bool) whether to compute the weight matrix
+	Return(s):
+	w_eff: (2D array) the weights of the portfolios (one row per point, None if weights is False)
+	mu_v: (1D array) the expected returns of the portfolios
+	sigma_v: (1D array) the risks of the portfolios
+	ind_max: (int or None) the index of the point with the highest Sharpe ratio (mu_v - R)/sigma_v (None if R is None
+	or if no point lies on the frontier)
+	'''
+
+	mCinv, uCinv, M = _frontier_terms(m, C)
+	Minv = np.linalg.inv(M)
+	a = Minv[0][0]*mCinv + Minv[1][0]*uCinv
+	b = Minv[0][1]*mCinv + Minv[1][1]*uCinv
+
+	if mu_v is None:
+		#Invert sigma(mu) on the efficient part of the line:
+		sigma_v = np.asarray(sigma_v, dtype=np.float64)
+		B, U = M[0][1], M[1][1]
+		D = M[0][0]*M[1][1] - M[0][1]*M[1][0]
+		with np.errstate(invalid='ignore'):
+			mu_v = (B + np.sqrt(D*(U*sigma_v*sigma_v - 1.)))/U
+	else:
+		mu_v = np.asarray(mu_v, dtype=np.float64)
+		var = Minv[0][0]*mu_v*mu_v + (Minv[0][1] + Minv[1][0])*mu_v + Minv[1][1]
+		sigma_v = np.sqrt(np.maximum(var, 0.))
+
+	w_eff = np.outer(mu_v, a) + b if weights else None
+
+	ind_max = None
+	if R is not None:
+		with np.errstate(divide='ignore', invalid='ignore'):
+			sharpe = np.where(sigma_v > 0, (mu_v - R)/sigma_v, np.nan)
+		#No point on the frontier (all the target risks below the minimum risk):
+		if not np.all(np.isnan(sharpe)):
+			ind_max = int(np.nanargmax(sharpe))
+
+	return w_eff, mu_v, sigma_v, ind_max
+
+
+def _box_bounds(n, lo, hi):
+	lo = np.broadcast_to(np.asarray(lo, dtype=np.float64), (n,)).copy()
+	hi = np.full(n, np.inf) if hi is None else np.broadcast_to(np.asarray(hi, dtype=np.float64), (n,)).copy()
+	if lo.sum() > 1. or hi.sum() < 1. or np.any(lo > hi):
+		raise ValueError("the bounds on the weights do not admit a fully invested portfolio")
+	return lo, hi
+
+
+def _greedy_extreme(m, lo, hi, sign=1.):
+	'''
+	Compute the fully invested portfolio within the bounds with the highest (sign = 1) or the lowest (sign = -1)
+	expected return, filling the securities from the highest (lowest) expected return up to their upper bound.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	m: (1D array) expected return for each security
+	lo: (1D array) lower bound of the weights
+	hi: (1D array) upper bound of the weights
+	sign: (float) 1 for the highest and -1 for the lowest expected return
+	Return:
+	w: (1D array) the weights of the portfolio
+	'''
+
+	w = lo.copy()
+	rem = 1. - lo.sum()
+	for i in np.argsort(-sign*m, kind='stable'):
+		if rem <= 0:
+			break
+		add = min(hi[i] - lo[i], rem)
+		w[i] += add
+		rem -= add
+
+	return w
+
+
+def _qp_active_set(C, A, b, lo, hi, w, max_iter):
+	'''
+	Minimise w C w^T/2 subject to A w = b and lo <= w <= hi with the primal active-set method, starting from
+	the feasible portfolio w. The working set holds the bounds fixed at the current iterate; each iteration
+	solves the equality constrained problem on the free weights (KKT system of the size of the free set),
+	moves towards its solution until a bound blocks (the bound joins the working set) and, at the solution,
+	releases the bound with the most negative multiplier.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	C: (2D array) covariance matrix between returns
+	A: (2D array) the equality constraints (rows u and m)
+	b: (1D array) the right-hand sides of the equality constraints
+	lo: (1D array) lower bound of the weights
+	hi: (1D array) upper bound of the weights
+	w: (1D array) a feasible starting portfolio
+	max_iter: (int) the maximum number of iterations
+	Return(s):
+	w: (1D array) the optimal weights (the last feasible iterate if max_iter is reached)
+	it: (int) the number of iterations
+	'''
+
+	n = len(w)
+	tol = 1e-12
+	at_lo = w <= lo + tol
+	at_hi = (w >= hi - tol) & ~at_lo
+	w = np.where(at_lo, lo, np.where(at_hi, hi, w))
+	g = C @ w
+
+	for it in range(max_iter):
+		F = np.flatnonzero(~(at_lo | at_hi))
+		k = len(F)
+		A_F = A[:, F]
+
+		#Equality constrained step on the free weights:
+		K = np.zeros((k + len(b), k + len(b)))
+		K[:k, :k] = C[np.ix_(F, F)]
+		K[:k, k:] = A_F.T
+		K[k:, :k] = A_F
+		rhs = np.concatenate([-g[F], np.zeros(len(b))])
+		try:
+			if k < len(b):
+				raise np.linalg.LinAlgError
+			sol = np.linalg.solve(K, rhs)
+		except np.linalg.LinAlgError:
+			sol = np.linalg.lstsq(K, rhs, rcond=None)[0]
+		p_F = sol[:k]
+		nu = sol[k:]
+
+		if np.abs(p_F).max(initial=0.) <= tol*max(1., np.abs(w[F]).max(initial=0.)):
+			#Multipliers of the bounds in the working set (reduced gradient):
+			r = g + A.T @ nu
+			viol = np.where(at_lo, -r, 0.) + np.where(at_hi, r, 0.)
+			j = int(np.argmax(viol))
+			if viol[j] <= tol*max(1., np.abs(g).max()):
+				return w, it
+			at_lo[j] = False
+			at_hi[j] = False
+			continue
+
+		#Step length limited by the bounds of the free weights:
+		alpha = 1.
+		block = -1
+		w_F = w[F]
+		with np.errstate(divide='ignore', invalid='ignore'):
+			ratio = np.where(p_F < 0, (lo[F] - w_F)/p_F, np.where(p_F > 0, (hi[F] - w_F)/p_F, np.inf))
+		if len(ratio) and ratio.min() < 1.:
+			block = int(np.argmin(ratio))
+			alpha = max(ratio[block], 0.)
+
+		w[F] = w_F + alpha*p_F
+		g += alpha*(C[:, F] @ p_F)
+		if block >= 0:
+			i = F[block]
+			if p_F[block] < 0:
+				at_lo[i] = True
+				w[i] = lo[i]
+			else:
+				at_hi[i] = True
+				w[i] = hi[i]
+
+	return w, max_iter
+
+
+def eff_frontier_qp(m, C, mu_v, lo=0., hi=None, w0=None, max_iter=None):
+	'''
+	Compute the weight associated with the minimum variance line for a given expected return mu_v when the weights
+	are bounded, lo <= w <= hi (lo = 0 forbids short selling), with the active-set quadratic programming method.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	m: (1D array) expected return for each security
+	C: (2D array or PreparedCovariance) covariance matrix between a pair of securities
+	mu_v: (float) expected return
+	lo: (float or 1D array) lower bound of the weights
+	hi: (float or 1D array or None) upper bound of the weights (None for no upper bound)
+	w0: (1D array or None) a feasible starting portfolio (fully invested, within the bounds and with expected return mu_v),
+	None to start from a combination of the portfolios with the highest and the lowest expected returns
+	max_iter: (int or None) the maximum number of iterations (None for 10 times the number of securities)
+	Return(s):
+	w_eff: (1D array) weight associated with the minimum variance line (nan if mu_v cannot be reached within the bounds)
+	sigma_v: the lowest risk for a given expected return mu_v
+	'''
+
+	w_eff, mu_b, sigma_v, ind = eff_frontier_qp_batch(m, C, [mu_v], lo, hi, w0=w0, max_iter=max_iter)
+
+	return w_eff[0], sigma_v[0]
+
+
+def eff_frontier_qp_batch(m, C, mu_v, lo=0., hi=None, R=None, w0=None, max_iter=None):
+	'''
+	Trace the minimum variance line with bounded weights, lo <= w <= hi (lo = 0 forbids short selling),
+	for an array of expected returns. The points are solved in order with the active-set method
+	(see _qp_active_set), each one warm started from the solution of the previous point: the previous portfolio is
+	moved towards the portfolio with the highest (or lowest) expected return until it reaches the new expected
+	return, which keeps most of the previous active bounds.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	m: (1D array) expected return for each security
+	C: (2D array or PreparedCovariance) covariance matrix between a pair of securities
+	mu_v: (1D array) expected returns along the minimum variance line
+	lo: (float or 1D array) lower bound of the weights
+	hi: (float or 1D array or None) upper bound of the weights (None for no upper bound)
+	R: (float or None) return of a risk-free security, to find the point with the highest Sharpe ratio
+	w0: (1D array or None) a feasible starting portfolio for the first point
+	max_iter: (int or None) the maximum number of iterations per point (None for 10 times the number of securities)
+	Return(s):
+	w_eff: (2D array) the weights of the portfolios (one row per point, nan where mu_v cannot be reached within the bounds)
+	mu_v: (1D array) the expected returns of the portfolios
+	sigma_v: (1D array) the risks of the portfolios
+	ind_max: (int or None) the index of the point with the highest Sharpe ratio (mu_v - R)/sigma_v (None if R is None)
+	'''
+
+	m = np.asarray(m, dtype=np.float64)
+	C = _cov_matrix(C)
+	mu_v = np.atleast_1d(np.asarray(mu_v, dtype=np.float64))
+	n = len(m)
+	lo, hi = _box_bounds(n, lo, hi)
+	if max_iter is None:
+		max_iter = 10*n
+
+	#The reachable expected returns:
+	w_max = _greedy_extreme(m, lo, hi, 1.)
+	w_min = _greedy_extreme(m, lo, hi, -1.)
+	mu_max = m @ w_max
+	mu_min = m @ w_min
+	tol = 1e-12*max(1., abs(mu_max), abs(mu_min))
+
+	A = np.stack([np.ones(n), m])
+	w_eff = np.full((len(mu_v), n), np.nan)
+	sigma_v = np.full(len(mu_v), np.nan)
+	w = None if w0 is None else np.array(w0, dtype=np.float64)
+	for j, mu in enumerate(mu_v):
+		if mu > mu_max + tol or mu < mu_min - tol:
+			continue
+
+		#Feasible start: move the previous portfolio towards the extreme portfolio on the side of mu:
+		if w is None:
+			w = w_min if mu_max - mu_min <= tol else w_min + (mu - mu_min)/(mu_max - mu_min)*(w_max - w_min)
+		else:
+			mu_w = m @ w
+			w_ext, mu_ext = (w_max, mu_max) if mu >= mu_w else (w_min, mu_min)
+			if abs(mu_ext - mu_w) > tol:
+				w = w + (mu - mu_w)/(mu_ext - mu_w)*(w_ext - w)
+
+		w, it = _qp_active_set(C, A, np.array([1., mu]), lo, hi, w.copy(), max_iter)
+		w_eff[j] = w
+		sigma_v[j] = max(float(w @ (C @ w)), 0.)**0.5
+
+	ind_max = None
+	if R is not None and np.any(sigma_v > 0):
+		with np.errstate(divide='ignore', invalid='ignore'):
+			sharpe = (mu_v - R)/sigma_v
+		ind_max = int(np.nanargmax(np.where(sigma_v > 0, sharpe, np.nan)))
+
+	return w_eff, mu_v, sigma_v, ind_max
+
+
 def eff_frontier_mp(m,C,R):
 	'''
 	Compute the weight associated with the market portfolio along the capital market line (CML).
 	C. Wibisono
 	04/30 '25
 	Function Argument(s):
-	m: list (1D arr of expected return for each security)
-	C: list (2D arr consisting of covariance matrix between a pair of securities)
+	m: (1D array) expected return for each security
+	C: (2D array or PreparedCovariance) covariance matrix between a pair of securities
 	R: (float) return of a risk-free security
 	Return(s):
-	w_eff_mp: weight associated with the market portfolio
+	w_eff_mp: (1D array) weight associated with the market portfolio
 	mu_v: the expected return of the market portfolio
 	sigma_v: the risk of the market portfolio
 	'''
-	Cinv = matinv(C)
-	dim = len(m)
-	u = []
-	w_eff_mp = []
-	mCinv = []
-	uCinv = []
-	denum = 0
-	for q in range(dim):
-		u.append(1)
-		mCinv.append(0)
-		uCinv.append(0)
-
-	for k0 in range(dim):
-		for k1 in range(dim):
-			mCinv[k0] = mCinv[k0] + (m[k1]*Cinv[k1][k0])
-			uCinv[k0] = uCinv[k0] + (u[k1]*Cinv[k1][k0])
-		a = mCinv[k0]
-		b = R*uCinv[k0]
-		temp = a - b
-		denum = denum + temp 
-
-	for k in range(dim):
-		temp_2 = (mCinv[k] -R*uCinv[k])/denum
-		w_eff_mp.append(temp_2)
-
-	
 
+	mCinv, uCinv, M = _frontier_terms(m, C)
+	temp = mCinv - R*uCinv #(m - Ru)C^-1
+	w_eff_mp = temp/temp.sum()
 
 	mu_b, sigma_b = value(m,C,w_eff_mp)
 
@@ -254,16 +812,14 @@ def minline(a,b,mu_v):
 	C. Wibisono
 	05/01 '25
 	Function Argument(s):
-	a: list(1D arr of vector a obtained from minimizing the variance line)
-	b: list(1D arr of vector b obtained from minimizing the variance line)
+	a: (1D array) vector a obtained from minimizing the variance line
+	b: (1D array) vector b obtained from minimizing the variance line
 	mu_v: (float) expected return
 	Return:
-	w: list (1D arr of weight factor of the portfolio lies along the minimum variance line)
+	w: (1D array) weight factor of the portfolio lies along the minimum variance line
 	'''
-	w = []
-	dim = len(a)
-	for k in range(dim):
-		w.append(mu_v*a[k]+b[k])
+
+	w = mu_v*np.asarray(a, dtype=np.float64) + np.asarray(b, dtype=np.float64)
 
 	return w
 
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
+import functools
+import math
 import numpy as np
 from . import contract as co
 from . import binomial as bo
+from . import blackscholes as bs
 
 '''
 Module Description:
@@ -11,7 +14,7 @@ Formalisms are based on Chapter 5 and 6 M. Capinski and T. Zastawniak
 Mathematics for Finance
 '''
 
-def eu_put_call(r,T,S,X,C_E,P_E):
+def eu_put_call(r,T,S,X,C_E,P_E,tol=1e-12):
 	'''
 	Check whether there is an arbitrage profit for the European call and put options
 	with the same strike price X.
@@ -24,12 +27,15 @@ def eu_put_call(r,T,S,X,C_E,P_E):
 	X: the strike price at the exercise time
 	C_E: European call price
 	P_E: European put price
+	tol: relative tolerance (to S + X) for the rounding errors of the prices
 	Return:
 	val: (bool) indicates whether arbitrage profit exists
 	'''
 
 	a = C_E - P_E
 	b = S - X*co.bond(r,0,T)
+	if abs(a - b) <= tol*(S + X):
+		return False
 	if a > b:
 		return True
 	if a < b:
@@ -38,7 +44,7 @@ def eu_put_call(r,T,S,X,C_E,P_E):
 		return False
 
 
-def eu_put_call_div_cont(r,T,S,X,r_div,C_E,P_E):
+def eu_put_call_div_cont(r,T,S,X,r_div,C_E,P_E,tol=1e-12):
 	'''
 	Check whether there is an arbitrage profit for the European call and put options
 	with the same strike price X and dividend paid continously with rate r_div.
@@ -52,12 +58,15 @@ def eu_put_call_div_cont(r,T,S,X,r_div,C_E,P_E):
 	r_div: the rate of dividend to be paid to the option holder
 	C_E: European call price
 	P_E: European put price
+	tol: relative tolerance (to S + X) for the rounding errors of the prices
 	Return:
 	val: (bool) indicates whether arbitrage profit exists
 	'''
 
 	a = C_E - P_E
 	b = (S*co.bond(r_div,0,T)) - (X*co.bond(r,0,T))
+	if abs(a - b) <= tol*(S + X):
+		return False
 	if a > b:
 		return True
 	if a < b:
@@ -343,20 +352,51 @@ def eu_option_binom_disc(R, U, D, S, X, N):
 	P_E: (float) the european put option price
 	'''
 
+	C_E, P_E = eu_option_binom_crr(R, U, D, S, X, N)
+
+	return float(C_E), float(P_E)
+
+def eu_option_binom_crr(R, U, D, S, X, N):
+	'''
+	Compute the European call and put option prices based on Cox-Ross-Rubinstein Formula
+	for a batch of contracts exercised after N time step.
+	The cost per contract does not grow with the number of time steps N.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	R: (float or array) the rate of risk-free security as a form of money market account 
+	U: (float or array) the rate of return if the risky security price goes up
+	D: (float or array) the rate of return if the risky security price goes down
+	S: (float or array) the risky security price at time 0
+	X: (float or array) the strike price at the exercise time
+	N: (int) the amount of time steps to exercise the asset
+	Note that R, U, D, S and X are broadcast against each other.
+	Return:
+	C_E: (array) the european call option prices
+	P_E: (array) the european put option prices
+	'''
+
+	R, U, D, S, X = [np.asarray(v, dtype=np.float64) for v in (R, U, D, S, X)]
+
 	m = bo.m_order(S, U, D, N, X)
-	q = ((1+ U)/(1+R))*bo.p_star(R, U, D)
+	pstar = bo.p_star(R, U, D)
+	q = ((1+ U)/(1+R))*pstar
+
+	#Lower and upper tails P(K <= m-1), P(K > m-1) of the binomial distribution:
+	cbd_q, cbd_q_c = bo.cbd_tail(m-1, N, q)
+	cbd_p, cbd_p_c = bo.cbd_tail(m-1, N, pstar)
 	
-	c1 = S*(1-bo.cbd(m-1, N, q))
-	c2 = (X/((1+R)**N))*(1-bo.cbd(m-1,N,bo.p_star(R,U,D)))
+	c1 = S*cbd_q_c
+	c2 = (X/((1+R)**N))*cbd_p_c
 	C_E = c1 - c2
 
-	p1 = -S*bo.cbd(m-1,N,q)
-	p2 = (X/((1+R)**N))*bo.cbd(m-1,N,bo.p_star(R,U,D))
+	p1 = -S*cbd_q
+	p2 = (X/((1+R)**N))*cbd_p
 	P_E = p1 + p2
 
 	return C_E, P_E
 
-def eu_option_binom_disc_level(R, U, D, S, X, N):
+def eu_option_binom_disc_level(R, U, D, S, X, N, prune=None, greeks=False):
 	'''
 	Compute the European call and put option prices following the binomial model with expiry time N per level.
 	C. Wibisono
@@ -368,9 +408,16 @@ def eu_option_binom_disc_level(R, U, D, S, X, N):
 	S: (float) the risky security price at time 0
 	X: (float) the strike price
 	N: (int) the amount of time when the option is expired (maximum amount of time that the option can be exercised)
+	prune: (float) if given, the backward induction is restricted to the nodes within prune standard deviations
+	of the expected number of down moves (see prune_band), the remaining nodes keep the lower bound max(S - X/(1+R)^(N-i), 0)
+	greeks: (bool) whether to return the option sensitivities read off the time steps 1 and 2 (see lattice_greeks)
 	Return:
-	C_A: (float) the american call option price
-	P_A: (list of TreeNode objects) the american put option prices for each time step up to expiry time N
+	C_E: (LatticeTree object) the european call option prices for each time step up to expiry time N
+	(only the band is stored if prune is given, see BandLattice)
+	P_E: (LatticeTree object) the european put option prices for each time step up to expiry time N
+	err: (float) the bound on the truncation error of the option prices at time 0 (only if prune is given, see prune_err)
+	greek_params: (dict) the sensitivities (delta, gamma, theta) of the european call ('C_E') and put ('P_E')
+	option prices (only if greeks is True)
 	'''
 	
 	#Compute the European-Call Option Price per level:
@@ -378,78 +425,197 @@ def eu_option_binom_disc_level(R, U, D, S, X, N):
 	#Risk-Neutral Probability:
 	pstar = bo.p_star(R, U, D)
 
-	#Compute the possible nodes for the risky-security prices:
-	node = bo.risky_security_binom_price(N, S, U, D)
-
-	#Number of total nodes:
-	dim = len(node)
-
-	#Create another nodes representing the value of option at each time-step:
-	dim_temp = int(2**N) -1
-	CE_node = [None] * dim
-	PE_node = [None] * dim #Put Option Price is determined from the put-call parity
-
 	#Put-Call Parity:
 	pc_parity = S - X/((1+R)**N)
 
+	#Nodes to be priced at each level:
+	lo, hi = prune_band(N, pstar, prune)
+
+	#Create a lattice representing the value of option at each time-step:
+	if prune is None:
+		CE_lat = bo.Lattice(N)
+	else:
+		#Only the band is stored, the nodes outside keep the lower bound of the call option:
+		bound = lambda i, k: np.maximum(bo.risky_security_binom_node(i, k, S, U, D) - X/((1+R)**(N-i)), 0)
+		CE_lat = bo.BandLattice(N, lo, hi, bound)
+
 	#Start pricing from the backward:
-	low = int(2**N) - 1
-	up = int(2**(N+1)) -1
-	
-	for i in range(low,up,1):
-		temp = bo.call_payoff(node[i].data,X)
-		temp_pe = temp - pc_parity
-		CE_node[i] = bo.TreeNode(temp)
-		PE_node[i] = bo.TreeNode(temp_pe)
-
-	#Compute the value of European option for level N-1:
-	ind_low = int(2**(N-1)) - 1
-	ind_up = int(2**(N)) - 1
-
-	k = 0
-	for j in range(ind_low,ind_up,1):
-		temp_b2_1 = pstar*bo.call_payoff(node[j].children[0].data,X)	
-		temp_b2_2 = (1-pstar)*bo.call_payoff(node[j].children[1].data,X)
-		temp_b2 = (1./(1.+R))*(temp_b2_1 + temp_b2_2)
-		temp_pe_b2 = temp_b2 - pc_parity	
-		
-		CE_node[j] = bo.TreeNode(temp_b2)
-		CE_node[j].add_child(CE_node[k+ind_up])
-		CE_node[j].add_child(CE_node[k+1+ind_up])
-			
-		PE_node[j] = bo.TreeNode(temp_pe_b2)
-		PE_node[j].add_child(PE_node[k+ind_up])
-		PE_node[j].add_child(PE_node[k+1+ind_up])
-				
-		k = k + 2
-
-
-	#Compute the value of European option for each level:
-	for i in range(N-2,-1,-1):
-		ind_low = int(2**i) - 1
-		ind_up = int(2**(i+1)) - 1
-
-		k = 0
-		for j in range(ind_low,ind_up,1):
-			temp_b2_1 = pstar*CE_node[k+ind_up].data
-			temp_b2_2 = (1-pstar)*CE_node[k+1+ind_up].data
-			temp_b2 = (1./(1.+R))*(temp_b2_1 + temp_b2_2)
-			temp_pe_b2 = temp_b2 - pc_parity	
-		
-			CE_node[j] = bo.TreeNode(temp_b2)
-			CE_node[j].add_child(CE_node[k+ind_up])
-			CE_node[j].add_child(CE_node[k+1+ind_up])
-			
-			PE_node[j] = bo.TreeNode(temp_pe_b2)
-			PE_node[j].add_child(PE_node[k+ind_up])
-			PE_node[j].add_child(PE_node[k+1+ind_up])
-				
-			k = k + 2
-
-
-	return CE_node, PE_node
-
-def am_option_binom_disc(R, U, D, S, X, N):
+	k = np.arange(lo[N], hi[N]+1)
+	CE_lat.nodes(N, lo[N], hi[N]+1)[:] = np.maximum(bo.risky_security_binom_node(N, k, S, U, D) - X, 0)
+
+	#Compute the value of European option for each level (children of node k are k and k+1):
+	for i in range(N-1,-1,-1):
+		a = lo[i]
+		b = hi[i] + 1
+		V = CE_lat.nodes(i+1, a, b+1)
+		CE_lat.nodes(i, a, b)[:] = (1./(1.+R))*(pstar*V[:-1] + (1-pstar)*V[1:])
+
+	#Put Option Price is determined from the put-call parity:
+	if prune is None:
+		PE_lat = bo.Lattice(N, CE_lat.data - pc_parity)
+	else:
+		PE_lat = bo.BandLattice(N, lo, hi, lambda i, k: bound(i, k) - pc_parity)
+		PE_lat.band_data[:] = CE_lat.band_data - pc_parity
+
+	ans = (bo.LatticeTree(CE_lat), bo.LatticeTree(PE_lat))
+	if prune is not None:
+		err = prune_err(R, U, D, S, X, N, lo, hi)
+		ans = ans + (err,)
+
+	if greeks:
+		#The put option values at the nodes follow from the put-call parity at each time step:
+		s_lat = bo.risky_security_binom_lattice(2, S, U, D)
+		p_lat = bo.Lattice(2)
+		for i in range(3):
+			p_lat.level(i)[:] = CE_lat.level(i) - s_lat.level(i) + X/((1+R)**(N-i))
+		greek_params = {}
+		greek_params['C_E'] = lattice_greeks(s_lat, CE_lat)
+		greek_params['P_E'] = lattice_greeks(s_lat, p_lat)
+		ans = ans + (greek_params,)
+
+	return ans
+
+def lattice_greeks(s_node, v_node):
+	'''
+	Compute the option sensitivities from the option values at the time steps 0, 1 and 2 of the binomial model.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	s_node: (Lattice or LatticeTree object) possible risky security prices (at least 2 time steps).
+	v_node: (Lattice or LatticeTree object) possible option values (at least 2 time steps).
+	Return:
+	greek_params: (dict) Dictionary containing greek parameters (key) and their values:
+	delta (first derivative with respect to the risky security price), gamma (second derivative with respect to
+	the risky security price) and theta (derivative with respect to the time, per time step)
+	'''
+
+	s_lat = bo.as_lattice(s_node)
+	v_lat = bo.as_lattice(v_node)
+
+	return _greeks_level(s_lat.level(0)[0], s_lat.level(1), s_lat.level(2), v_lat.level(0)[0], v_lat.level(1), v_lat.level(2))
+
+def _greeks_level(S0, S1, S2, V0, V1, V2):
+	'''
+	Delta, gamma and theta from the nodes of the time steps 0, 1 and 2 along the last axis.
+	'''
+
+	greek_params = {}
+
+	#Sensitivity with respect to risky security price change:
+	greek_params['delta'] = (V1[..., 0] - V1[..., 1])/(S1[..., 0] - S1[..., 1])
+
+	#Second derivative with respect to risky security price change:
+	delta_up = (V2[..., 0] - V2[..., 1])/(S2[..., 0] - S2[..., 1])
+	delta_down = (V2[..., 1] - V2[..., 2])/(S2[..., 1] - S2[..., 2])
+	greek_params['gamma'] = (delta_up - delta_down)/(0.5*(S2[..., 0] - S2[..., 2]))
+
+	#Sensitivity with respect to the time (the middle node at time step 2 after two time steps), the middle node
+	#only returns to S0 if (1+U)(1+D) = 1, remove the move along the price to second order otherwise:
+	dS = S2[..., 1] - S0
+	greek_params['theta'] = 0.5*(V2[..., 1] - V0 - greek_params['delta']*dS - 0.5*greek_params['gamma']*dS*dS)
+
+	return greek_params
+
+def prune_band(N, pstar, prune=None):
+	'''
+	Compute the band of lattice nodes kept by the pruned backward induction. At time step i the number of down moves
+	has the mean i(1-p) and the variance ip(1-p) under the risk-neutral probability p, the band keeps the nodes within
+	prune standard deviations of the mean (all nodes if prune is None).
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	N: (int) the amount of time when the option is expired
+	pstar: (float) the risk-neutral probability
+	prune: (float) the half width of the band in standard deviations
+	Return:
+	lo: (array of int) the first node kept for time steps 0 to N
+	hi: (array of int) the last node kept for time steps 0 to N
+	'''
+
+	i = np.arange(N+1)
+	if prune is None:
+		return np.zeros(N+1, dtype=np.int64), i
+
+	centre = i*(1.-pstar)
+	width = prune*np.sqrt(i*pstar*(1.-pstar))
+	lo = np.maximum(np.floor(centre - width), 0).astype(np.int64)
+	hi = np.minimum(np.ceil(centre + width), i).astype(np.int64)
+
+	return lo, hi
+
+def prune_err(R, U, D, S, X, N, lo, hi, american=False):
+	'''
+	Compute the bound on the truncation error of the option price at time 0 caused by the pruning of prune_band.
+	The backward induction only reads a node outside the band where a path leaves the band for the first time
+	(a child of a band node). Since the induction is monotone, the error is at most the sum over these nodes of
+	the discounted probability to reach the node (bounded by the binomial probability of its number of down moves)
+	times the error of the value kept at the node. The latter is bounded with the Hoeffding inequality
+	P(K - n(1-p) >= t) <= exp(-2t^2/n) for the number of down moves K over the remaining n time steps:
+	european call (lower bound max(S - X/(1+R)^n, 0)): the put value X/(1+R)^n P(S_N < X) above the strike,
+	the call value S Q(S_N > X) below it (Q the probability with p(1+U)/(1+R) for an up move),
+	american put (payoff max(X - S, 0)): X P(S_t < X for some t) above the strike (Hoeffding's maximal inequality),
+	the european call value below it (P_A <= C_E - S + X).
+	The bound exceeds the truncation error by about two orders of magnitude, it is only meaningful
+	for prune >= 5 (e.g. 3e-6 for a truncation error of 1e-8 with prune = 6 and N = 5000).
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	R: (float) the rate of risk-free security as a form of money market account
+	U: (float) the rate of return if the risky security price goes up
+	D: (float) the rate of return if the risky security price goes down
+	S: (float) the risky security price at time 0
+	X: (float) the strike price
+	N: (int) the amount of time when the option is expired
+	lo: (array of int) the first node kept for time steps 0 to N (see prune_band)
+	hi: (array of int) the last node kept for time steps 0 to N (see prune_band)
+	american: (bool) whether the bound is for the american put option (True) or the european options (False)
+	Return:
+	val: (float) the bound on the truncation error of the option price at time 0
+	'''
+
+	pstar = bo.p_star(R, U, D)
+	qstar = pstar*(1.+U)/(1.+R)
+
+	#Nodes where a path leaves the band (at the expiry time the kept values are exact):
+	i_out = []
+	k_out = []
+	for i in range(N-1):
+		for k in list(range(lo[i], min(lo[i+1], hi[i]+2))) + list(range(max(hi[i+1]+1, lo[i]), hi[i]+2)):
+			i_out.append(i+1)
+			k_out.append(k)
+	if len(i_out) == 0:
+		return 0.
+
+	i = np.array(i_out)
+	k = np.array(k_out)
+	n = N - i
+	S_n = bo.risky_security_binom_node(i, k, S, U, D)
+	disc = (1.+R)**(-n.astype(np.float64))
+
+	#Hoeffding bound on the probability of t more down moves than expected:
+	tail = lambda t: np.where(t > 0, np.exp(-2.*np.maximum(t, 0)**2/n), 1.)
+
+	#S_N < X if and only if the number of down moves exceeds z:
+	logu = math.log1p(U)
+	logd = math.log1p(D)
+	z = (np.log(S_n/X) + n*logu)/(logu - logd)
+	call = S_n*tail(n*(1.-qstar) - z)
+	if american:
+		#S_t < X if and only if the number of down moves after t steps exceeds z_0 + t logu/(logu - logd):
+		drift = logu/(logu - logd) - (1.-pstar)
+		hit = tail(np.log(S_n/X)/(logu - logd) + min(drift, 0.)*n)
+		gap = np.where(S_n >= X, X*hit, np.minimum(call, S_n))
+	else:
+		gap = np.where(S_n >= X*disc, X*disc*tail(z - n*(1.-pstar)), call)
+
+	#Discounted binomial probability of k down moves in i steps:
+	lcomb = np.array([math.lgamma(u+1) - math.lgamma(v+1) - math.lgamma(u-v+1) for u, v in zip(i_out, k_out)])
+	prob = np.exp(lcomb + (i - k)*math.log(pstar) + k*math.log1p(-pstar) - i*math.log1p(R))
+
+	val = np.sum(prob*gap)
+	return float(min(val, X))
+
+def am_option_binom_disc(R, U, D, S, X, N, prune=None, greeks=False):
 	'''
 	Compute the American call and put option prices following the binomial model with expiry time N.
 	Note that the option can be exercised somewhere between present (time 0) up to expiry time N.
@@ -462,9 +628,16 @@ def am_option_binom_disc(R, U, D, S, X, N):
 	S: (float) the risky security price at time 0
 	X: (float) the strike price
 	N: (int) the amount of time when the option is expired (maximum amount of time that the option can be exercised)
+	prune: (float) if given, the backward induction is restricted to the nodes within prune standard deviations
+	of the expected number of down moves (see prune_band), the remaining nodes keep the payoff max(X - S, 0)
+	greeks: (bool) whether to return the option sensitivities read off the time steps 1 and 2 (see lattice_greeks)
 	Return:
 	C_A: (float) the american call option price
-	P_A: (list of TreeNode objects) the american put option prices for each time step up to expiry time N
+	P_A: (LatticeTree object) the american put option prices for each time step up to expiry time N
+	(only the band is stored if prune is given, see BandLattice)
+	err: (float) the bound on the truncation error of the put option price at time 0 (only if prune is given, see prune_err)
+	greek_params: (dict) the sensitivities (delta, gamma, theta) of the american call ('C_A') and put ('P_A')
+	option prices (only if greeks is True)
 	'''
 	
 	#With no dividend is paid, the american call option will be equal to european call option price.
@@ -472,77 +645,313 @@ def am_option_binom_disc(R, U, D, S, X, N):
 
 	#Compute the American Put Option Price:
 	#===================================================================
+	s_lat, H_lat, x_lat, y_lat = am_option_hedge_portfolio(R, U, D, S, X, N, hedge=False, prune=prune)
+
+	ans = (C_A, bo.LatticeTree(H_lat))
+	if prune is not None:
+		lo, hi = prune_band(N, bo.p_star(R, U, D), prune)
+		err = prune_err(R, U, D, S, X, N, lo, hi, american=True)
+		ans = ans + (err,)
+
+	if greeks:
+		#The call option values at time steps 1 and 2 follow from the Cox-Ross-Rubinstein Formula:
+		c_lat = bo.Lattice(2)
+		c_lat.level(0)[:] = C_A
+		for i in (1, 2):
+			c_lat.level(i)[:] = eu_option_binom_crr(R, U, D, s_lat.level(i), X, N-i)[0]
+		greek_params = {}
+		greek_params['C_A'] = lattice_greeks(s_lat, c_lat)
+		greek_params['P_A'] = lattice_greeks(s_lat, H_lat)
+		ans = ans + (greek_params,)
+
+	return ans
+
+
+def am_option_hedge_portfolio(R, U, D, S, X, N, hedge=True, prune=None):
+	'''
+	Compute the American put option values together with the replicating portfolio of the option writer
+	for all nodes and all time steps in a single backward induction.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	R: (float) the rate of risk-free security as a form of money market account
+	U: (float) the rate of return if the risky security price goes up
+	D: (float) the rate of return if the risky security price goes down
+	S: (float) the risky security price at time 0
+	X: (float) the strike price
+	N: (int) the amount of time when the option is expired (maximum amount of time that the option can be exercised)
+	hedge: (bool) whether to compute the stock and money-market positions
+	prune: (float) if given, the backward induction is restricted to the nodes within prune standard deviations
+	of the expected number of down moves (see prune_band), the remaining nodes keep the payoff max(X - S, 0)
+	and no position (nan)
+	Return:
+	If prune is given the lattices are BandLattice objects which only store the band of nodes.
+	s_lat: (Lattice object) the risky security prices up to expiry time N
+	h_lat: (Lattice object) the american put option values up to expiry time N
+	x_lat: (Lattice object) the stock position held from time step i to i+1 up to time step N-1 (None if hedge is False)
+	y_lat: (Lattice object) the money-market position held from time step i to i+1 up to time step N-1,
+	in units of the money market account A(i) = (1+R)^i (None if hedge is False).
+	The portfolio replicates the option values at the children: x S(i+1) + y A(i+1) = H(i+1)
+	'''
+
 	#Risk-Neutral Probability:
 	pstar = bo.p_star(R, U, D)
 
-	#Compute the possible nodes for the risky-security prices:
-	node = bo.risky_security_binom_price(N, S, U, D)
+	#Nodes to be priced at each level:
+	lo, hi = prune_band(N, pstar, prune)
+
+	#Create lattices representing the risky security prices, the value of option and the positions at each time-step:
+	x_lat = None
+	y_lat = None
+	if prune is None:
+		s_lat = bo.risky_security_binom_lattice(N, S, U, D)
+		h_lat = bo.Lattice(N)
+		if hedge:
+			x_lat = bo.Lattice(N-1)
+			y_lat = bo.Lattice(N-1)
+	else:
+		#Only the band is stored, the nodes outside keep the payoff and no position (nan):
+		price = lambda i, k: bo.risky_security_binom_node(i, k, S, U, D)
+		s_lat = bo.BandLattice(N, lo, hi, price, fill=True)
+		h_lat = bo.BandLattice(N, lo, hi, lambda i, k: np.maximum(X - price(i, k), 0))
+		if hedge:
+			x_lat = bo.BandLattice(N-1, lo, hi)
+			y_lat = bo.BandLattice(N-1, lo, hi)
+
+	#Start pricing from the backward:
+	h_lat.nodes(N, lo[N], hi[N]+1)[:] = np.maximum(X - s_lat.nodes(N, lo[N], hi[N]+1), 0)
+
+	#Compute the value of american option for each level (children of node k are k and k+1):
+	for i in range(N-1,-1,-1):
+		a = lo[i]
+		b = hi[i] + 1
+		V = h_lat.nodes(i+1, a, b+1)
+		temp_b1 = np.maximum(X - s_lat.nodes(i, a, b), 0)
+		temp_b2 = (1./(1.+R))*(pstar*V[:-1] + (1-pstar)*V[1:])
+		h_lat.nodes(i, a, b)[:] = np.maximum(temp_b1, temp_b2)
+
+		if hedge:
+			S_n = s_lat.nodes(i+1, a, b+1)
+			x = (V[:-1] - V[1:])/(S_n[:-1] - S_n[1:])
+			x_lat.nodes(i, a, b)[:] = x
+			y_lat.nodes(i, a, b)[:] = (V[:-1] - x*S_n[:-1])/((1.+R)**(i+1))
+
+	return s_lat, h_lat, x_lat, y_lat
+
+
+def am_put_exercise_boundary(R, U, D, X, N):
+	'''
+	Compute the early exercise boundary of the American put option following the binomial model with expiry time N,
+	i.e. for each time step the highest risky security price at which the immediate exercise is optimal.
+	The boundary is evaluated on the lattice starting from the strike price (S = X) and is cached on (R, U, D, X, N),
+	so that repeated queries are a table lookup. For a lattice starting from another price S_0 != X the nodes do not
+	coincide with the nodes of the boundary, a price is then only classified to within one lattice step.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	R: (float) the rate of risk-free security as a form of money market account
+	U: (float) the rate of return if the risky security price goes up
+	D: (float) the rate of return if the risky security price goes down
+	X: (float) the strike price
+	N: (int) the amount of time when the option is expired (maximum amount of time that the option can be exercised)
+	Return:
+	boundary: (read-only array) the critical risky security price for time steps 0 to N (nan if the option is not exercised
+	at any node of the time step)
+	'''
+
+	return _am_put_boundary(float(R), float(U), float(D), float(X), int(N))
 
-	#Number of total nodes:
-	dim = len(node)
+@functools.lru_cache(maxsize=256)
+def _am_put_boundary(R, U, D, X, N):
+	'''
+	Backward induction for am_put_exercise_boundary keeping only the current time step in memory.
+	'''
 
-	#Create another nodes representing the value of option at each time-step:
-	dim_temp = int(2**N) -1
-	H_node = [None] * dim
+	#Risk-Neutral Probability:
+	pstar = bo.p_star(R, U, D)
+
+	boundary = np.full(N+1, np.nan)
+
+	#Start pricing from the backward (node k counts the number of down moves), the prices of every time step
+	#come from the same powers as the lattice (X(1+U)^(i-k)(1+D)^k, see bo.risky_security_binom_node) rather than
+	#repeated division, so that the boundary holds the exact node prices:
+	k = np.arange(N+1)
+	pow_u = np.power(1.+U, k)
+	pow_d = np.power(1.+D, k)
+	s = X*pow_u[N-k]*pow_d[k]
+	V = np.maximum(X - s, 0)
+	exercise = s < X
+	if np.any(exercise):
+		boundary[N] = s[exercise].max()
+
+	for i in range(N-1,-1,-1):
+		s = X*pow_u[i-k[:i+1]]*pow_d[:i+1]
+		temp_b1 = np.maximum(X - s, 0)
+		temp_b2 = (1./(1.+R))*(pstar*V[:-1] + (1-pstar)*V[1:])
+		exercise = (temp_b1 > 0) & (temp_b1 >= temp_b2)
+		if np.any(exercise):
+			boundary[i] = s[exercise].max()
+		V = np.maximum(temp_b1, temp_b2)
+
+	boundary.flags.writeable = False
+	return boundary
+
+def am_put_exercise(R, U, D, X, N, S_t, time_step):
+	'''
+	Decide whether the American put option should be exercised at time step time_step,
+	using the cached early exercise boundary (see am_put_exercise_boundary). The prices are compared with a relative
+	tolerance of 1e-12, so that a node price computed by repeated multiplication (rather than the power formula of
+	the lattice) is still classified exactly. For S_0 != X the boundary comes from the lattice rooted at X and the
+	decision is only accurate to within one lattice step.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	R: (float) the rate of risk-free security as a form of money market account
+	U: (float) the rate of return if the risky security price goes up
+	D: (float) the rate of return if the risky security price goes down
+	X: (float) the strike price
+	N: (int) the amount of time when the option is expired (maximum amount of time that the option can be exercised)
+	S_t: (float or array) the risky security price at time step time_step
+	time_step: (int or array) the present time step
+	Return:
+	val: (bool or array of bool) indicates whether the option should be exercised
+	'''
+
+	boundary = am_put_exercise_boundary(R, U, D, X, N)
+	val = np.asarray(S_t) <= boundary[time_step]*(1. + 1e-12)
+	return val[()]
+
+
+def am_option_binom_disc_batch(R, U, D, S, X, N, greeks=False):
+	'''
+	Compute the American call and put option prices following the binomial model with expiry time N
+	for a batch of contracts at once (e.g. an option chain over strike prices and risky security prices).
+	The backward induction is carried out level by level over the lattice and the batch simultaneously.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	R: (float or array) the rate of risk-free security as a form of money market account
+	U: (float or array) the rate of return if the risky security price goes up
+	D: (float or array) the rate of return if the risky security price goes down
+	S: (float or array) the risky security price at time 0
+	X: (float or array) the strike price
+	N: (int) the amount of time when the option is expired (maximum amount of time that the option can be exercised)
+	Note that R, U, D, S and X are broadcast against each other.
+	greeks: (bool) whether to return the option sensitivities read off the time steps 1 and 2 (see lattice_greeks)
+	Return:
+	C_A: (array) the american call option prices with the broadcast shape of the arguments
+	P_A: (array) the american put option prices with the broadcast shape of the arguments
+	greek_params: (dict) the sensitivities (delta, gamma, theta) as arrays of the american call ('C_A') and put ('P_A')
+	option prices (only if greeks is True)
+	'''
+
+	R, U, D, S, X = np.broadcast_arrays(*[np.asarray(v, dtype=np.float64) for v in (R, U, D, S, X)])
+	shape = S.shape
+
+	#One row per contract, one column per node (k counts the number of down moves):
+	R, U, D, S, X = [v.reshape(-1,1) for v in (R, U, D, S, X)]
+
+	#Risk-Neutral Probability:
+	pstar = bo.p_star(R, U, D)
+	disc = 1./(1.+R)
 
 	#Start pricing from the backward:
-	low = int(2**N) - 1
-	up = int(2**(N+1)) -1
+	k = np.arange(N+1)
+	s = S*np.power(1.+U, N-k)*np.power(1.+D, k)
+	C = np.maximum(s - X, 0)
+	P = np.maximum(X - s, 0)
+
+	#Compute the option values for each level (children of node k are k and k+1).
+	#With no dividend is paid, the american call is never exercised before the expiry time.
+	level = {}
+	for i in range(N-1,-1,-1):
+		if greeks and i < 2:
+			level[i+1] = (s, C, P)
+		s = s[:, :-1]/(1.+U)
+		C = disc*(pstar*C[:, :-1] + (1-pstar)*C[:, 1:])
+		P = np.maximum(np.maximum(X - s, 0), disc*(pstar*P[:, :-1] + (1-pstar)*P[:, 1:]))
+
+	if greeks:
+		(S1, C1, P1), (S2, C2, P2) = level[1], level[2]
+		greek_params = {}
+		greek_params['C_A'] = _greeks_level(s[:, 0], S1, S2, C[:, 0], C1, C2)
+		greek_params['P_A'] = _greeks_level(s[:, 0], S1, S2, P[:, 0], P1, P2)
+		for v in greek_params.values():
+			for key in v:
+				v[key] = v[key].reshape(shape)
+		return C[:, 0].reshape(shape), P[:, 0].reshape(shape), greek_params
+
+	return C[:, 0].reshape(shape), P[:, 0].reshape(shape)
+
+
+def am_option_binom_accel(S, X, T, r, sigma, N=None, tol=None, method='lr', N_max=20000):
+	'''
+	Compute the American call and put option prices following the binomial model with a convergence acceleration,
+	for a batch of contracts with continuously compounded rate r and volatility sigma up to the exercise time T.
+	method 'lr': Leisen-Reimer single step returns (see blackscholes.return_h_lr) with an odd number of steps.
+	method 'richardson': the Leisen-Reimer prices extrapolated over N and 2N+1 steps assuming an error proportional to 1/N,
+	P = ((2N+1)P(2N+1) - N P(N))/(N+1).
+	If the accuracy target tol is given, the number of steps is doubled (starting from N, or 25) until the
+	estimated error is below tol for every contract or N_max is reached; converged tells the contracts apart
+	that did not meet the target.
+	C. Wibisono
+	10/17 '26
+	Function Argument(s):
+	S: (float or array) the risky security price at time 0
+	X: (float or array) the strike price
+	T: (float or array) the exercise time measured in years
+	r: (float or array) continuosly compounded risk-free interest rate
+	sigma: (float or array) volatility of the risky security
+	N: (int) the number of time steps (the starting number of time steps if tol is given)
+	tol: (float) the accuracy target for the option prices
+	method: (str) 'lr' or 'richardson'
+	N_max: (int) the largest number of time steps allowed to meet the accuracy target
+	Return:
+	C_A: (array) the american call option prices
+	P_A: (array) the american put option prices
+	N: (int) the number of time steps used
+	err: (array) the estimated error of the put option prices (difference to the estimate with about half the time steps)
+	converged: (array of bool) whether the estimated error meets tol (True for all the contracts if tol is not given)
+	'''
+
+	if method not in ('lr', 'richardson'):
+		raise ValueError("method must be 'lr' or 'richardson'")
+	if N is None:
+		if tol is None:
+			raise ValueError("either the number of time steps N or the accuracy target tol is required")
+		N = 25
+
+	def price(n):
+		if method == 'lr':
+			R, U, D = bs.return_h_lr(S, X, r, sigma, T, n)
+			return am_option_binom_disc_batch(R, U, D, S, X, n)
+
+		#Two-point Richardson extrapolation of the Leisen-Reimer prices over n and 2n+1 steps,
+		#assuming an error proportional to 1/n:
+		R, U, D = bs.return_h_lr(S, X, r, sigma, T, n)
+		C_1, P_1 = am_option_binom_disc_batch(R, U, D, S, X, n)
+		R, U, D = bs.return_h_lr(S, X, r, sigma, T, 2*n+1)
+		C_2, P_2 = am_option_binom_disc_batch(R, U, D, S, X, 2*n+1)
+		w = (2.*n + 1.)/(n + 1.)
+		return w*C_2 - (w - 1.)*C_1, w*P_2 - (w - 1.)*P_1
+
+	#Leisen-Reimer parameterisation requires an odd number of steps:
+	step = lambda n: n + 1 - n % 2
 	
-	for i in range(low,up,1):
-		temp = bo.put_payoff(node[i].data,X)
-		H_node[i] = bo.TreeNode(temp)
+	N = step(N)
+	C_prev, P_prev = price(step(N//2))
+	C_A, P_A = price(N)
+	err = np.abs(P_A - P_prev)
 
-	#Compute the value of american option for N-1 level:
-	ind_low = int(2**(N-1)) - 1
-	ind_up = int(2**(N)) - 1
+	while tol is not None and np.any(err > tol) and 2*N <= N_max:
+		N = step(2*N)
+		C_prev, P_prev = C_A, P_A
+		C_A, P_A = price(N)
+		err = np.abs(P_A - P_prev)
 
-	k = 0
-	
-	for j in range(ind_low,ind_up,1):
-		temp_b1 = bo.put_payoff(node[j].data,X)
-		temp_b2_1 = pstar*bo.put_payoff(node[j].children[0].data,X)	
-		temp_b2_2 = (1-pstar)*bo.put_payoff(node[j].children[1].data,X)
-		temp_b2 = (1./(1.+R))*(temp_b2_1 + temp_b2_2)
-			
-		
-		if temp_b1 < temp_b2:
-			H_node[j] = bo.TreeNode(temp_b2)
-			H_node[j].add_child(H_node[k+ind_up])
-			H_node[j].add_child(H_node[k+1+ind_up])
-		else:
-			H_node[j] = bo.TreeNode(temp_b1)
-			H_node[j].add_child(H_node[k+ind_up])
-			H_node[j].add_child(H_node[k+1+ind_up])
-
-		k = k + 2
-
-	#Compute the value of american option for each level:
-	for i in range(N-2,-1,-1):
-		ind_low = int(2**i) - 1
-		ind_up = int(2**(i+1)) - 1
-
-		k = 0
-		for j in range(ind_low,ind_up,1):
-			temp_b1 = bo.put_payoff(node[j].data,X)
-			temp_b2_1 = pstar*H_node[k+ind_up].data
-			temp_b2_2 = (1-pstar)*H_node[k+1+ind_up].data
-			temp_b2 = (1./(1.+R))*(temp_b2_1 + temp_b2_2)
-			
-		
-			if temp_b1 < temp_b2:
-				H_node[j] = bo.TreeNode(temp_b2)
-				H_node[j].add_child(H_node[k+ind_up])
-				H_node[j].add_child(H_node[k+1+ind_up])
-			else:
-				H_node[j] = bo.TreeNode(temp_b1)
-				H_node[j].add_child(H_node[k+ind_up])
-				H_node[j].add_child(H_node[k+1+ind_up])
-
-			k = k + 2
-
-
-	return C_A, H_node
+	converged = err <= tol if tol is not None else np.ones(np.shape(err), dtype=bool)
+
+	return C_A, P_A, N, err, converged
 
 
 def am_option_hedge_stock(s_node, h_node):
@@ -551,98 +960,61 @@ def am_option_hedge_stock(s_node, h_node):
 	C. Wibisono
 	05/23 '25
 	Function Argument(s):
-	s_node: (list of TreeNode objects) list of possible risky security prices.
-	h_node: (list of TreeNode objects) list of possible put option values.
+	s_node: (Lattice or LatticeTree object) possible risky security prices.
+	h_node: (Lattice or LatticeTree object) possible put option values.
 	Return:
-	x_node: (list of TreeNode object) list of possible stock position.
+	x_node: (LatticeTree object) possible stock position up to time step N-1.
 	'''
 
+	s_lat = bo.as_lattice(s_node)
+	h_lat = bo.as_lattice(h_node)
+
 	#Count the number of steps:
-	dim = len(h_node)
-	N = int(np.log2(dim + 1)) -1
-	x_node =[None] * (int(2**(N)) - 1)
+	N = h_lat.N
 
-	#Start pricing from the backward:
-	low = int(2**(N-1)) - 1
-	up = int(2**(N)) -1
-	
-	for i in range(low,up,1):
-		num = h_node[i].children[0].data - h_node[i].children[1].data
-		denum = s_node[i].children[0].data -s_node[i].children[1].data
-		x_node[i] = bo.TreeNode(num/denum)
-	
-	#Compute the value of american option for each level:
-	for i in range(N-2,-1,-1):
-		ind_low = int(2**i) - 1
-		ind_up = int(2**(i+1)) - 1
-
-		k = 0
-		for j in range(ind_low,ind_up,1):
-			num = h_node[j].children[0].data - h_node[j].children[1].data
-			denum = s_node[j].children[0].data -s_node[j].children[1].data
-			x_node[j] = bo.TreeNode(num/denum)
-		
-			x_node[j].add_child(x_node[k+ind_up])
-			x_node[j].add_child(x_node[k+1+ind_up])
-
-			k = k + 2
-	
+	#Position of the up and down children for every node before the expiry time:
+	up, down = h_lat.children()
 
-	return x_node
+	num = h_lat.data[up] - h_lat.data[down]
+	denum = s_lat.data[up] - s_lat.data[down]
+	x_lat = bo.Lattice(N-1, num/denum)
+
+	return bo.LatticeTree(x_lat)
 
 
 def am_option_hedge_market(x_node, s_node, h_0, R):
 	'''
 	Compute the money-market position for the option writer to readjust the portfolio.
+	The money-market position depends on the path (an early exercise surplus is carried forward), so it is
+	computed for every path of the binary tree rather than on the recombining lattice.
 	C. Wibisono
 	05/23 '25
 	Function Argument(s):
-	s_node: (list of TreeNode objects) list of possible risky security prices.
-	x_node: (list of TreeNode objects) list of possible risky security position.
+	s_node: (Lattice or LatticeTree object) possible risky security prices.
+	x_node: (Lattice or LatticeTree object) possible risky security position.
 	h_0: (float) American put option price.
 	R: (float) the rate of risk-free security as a form of money market account
 	Return:
-	y_node: (list of TreeNode object) list of money market position.
+	y_node: (HeapTree object) money market position for every node of the binary tree.
 	'''
 
+	x_lat = bo.as_lattice(x_node)
+	s_lat = bo.as_lattice(s_node)
+
 	#Count the number of steps:
-	dim = len(x_node)
-	y_node =[None] * dim
-	N =int(np.log2(dim+1)) - 1
+	N = x_lat.N
+	y_node = bo.HeapTree(N)
 
 	#Compute the initial money market position:
-	y_node[0] = bo.TreeNode(h_0 - (x_node[0].data)*s_node[0].data)
+	y_node.level(0)[0] = h_0 - x_lat.level(0)[0]*s_lat.level(0)[0]
+	k = np.zeros(1, dtype=np.int64)
 
-	
-	#Compute the value of american option for each level:
+	#Readjust the position along every path, the node j of the tree at time step i descends from
+	#the node j//2 of time step i-1 and lies at the lattice node k (the number of down moves):
 	for i in range(1,N+1,1):
-		ind_low = int(2**i) - 1
-		ind_up = int(2**(i+1)) - 1
-
-		ind_low_1 = int(2**(i-1)) -1
-		k = ind_low_1
-		q = 0
-		for j in range(ind_low,ind_up,1):
-			temp = y_node[k].data + ((1./((1.+R)**i)))*(x_node[k].data - x_node[j].data)*(s_node[j].data)
-			q = q + 1
-			if q % 2 == 0:
-				k = k + 1
-			else:
-				k = k
-			
-			y_node[j] = bo.TreeNode(temp)	
-	
-	#Make relation between nodes:
-	for i in range(N-2,-1,-1):
-		ind_low = int(2**i) - 1
-		ind_up = int(2**(i+1)) - 1
-
-		k = 0
-		for j in range(ind_low,ind_up,1):
-			y_node[j].add_child(y_node[k+ind_up])
-			y_node[j].add_child(y_node[k+1+ind_up])
-
-			k = k + 2
+		k_prev = np.repeat(k, 2)
+		k = k_prev + np.tile([0, 1], len(k))
+		y_node.level(i)[:] = np.repeat(y_node.level(i-1), 2) + ((1./((1.+R)**i)))*(x_lat.level(i-1)[k_prev] - x_lat.level(i)[k])*s_lat.level(i)[k]
 
 	return y_node
 
@@ -653,38 +1025,25 @@ def am_hedging_option(s_node, h_node, time_step):
 	C. Wibisono
 	05/23 '25
 	Function Argument(s):
-	s_node: (list of TreeNode objects) list of possible risky security prices.
-	h_node: (list of TreeNode objects) list of possible put option values.
+	s_node: (Lattice or LatticeTree object) possible risky security prices.
+	h_node: (Lattice or LatticeTree object) possible put option values.
 	time_step: (int) time_step to evaluate option writer position.
 	Return:
-	pos: (list of tuple) stock and money market position.
+	pos: (list of tuple) stock and money market position for each node at time step time_step-1
+	(ordered from the highest to the lowest risky security price).
 	'''
 
-	arr_S = bo.risky_security_binom_price_level(time_step - 1, s_node)
-	arr_P = bo.risky_security_binom_price_level(time_step - 1, h_node)
-
-	pos_a = []
-	pos_b = []
-	pos_c = [] #temporary arr to store the put values
-	pos_d = [] #temporary arr to store the stock values
-	for k1 in arr_P.keys():
-		num = arr_P[k1][0] - arr_P[k1][1]
-		pos_a.append(num)
-		pos_c.append(k1)
+	s_lat = bo.as_lattice(s_node)
+	h_lat = bo.as_lattice(h_node)
 
-	for k2 in arr_S.keys():
-		denum = arr_S[k2][0] -arr_S[k2][1]
-		pos_b.append(denum)
-		pos_d.append(k2)
-
-	dim = len(pos_a)
+	S = s_lat.level(time_step - 1)
+	H = h_lat.level(time_step - 1)
+	S_n = s_lat.level(time_step)
+	H_n = h_lat.level(time_step)
 
 	#Compute the risky security and money market positions for the option writer to readjust:
-	pos = []
-	for i in range(dim):
-		temp = pos_a[i]/pos_b[i]
-		temp_b = pos_c[i] - temp*pos_d[i]
-		pos.append((temp, temp_b))
+	temp = (H_n[:-1] - H_n[1:])/(S_n[:-1] - S_n[1:])
+	temp_b = H - temp*S
+	pos = list(zip(temp.tolist(), temp_b.tolist()))
 
 	return pos
-
@@ -34,60 +34,16 @@ def ex313():
 	Cov23 = op.cov_construct(rho23,sigma23)
 	Cov13 = op.cov_construct(rho13,sigma13)
 
-	#Compute the vectors a and b associated with the minimum variance line:
-	a, b = op.eff_frontier_vector(m,Cov)
-
-	#Compute the vectors a and b associated with the minimum variance line of each pair pf security:
-	a12, b12 = op.eff_frontier_vector(m12,Cov12)
-	a23, b23 = op.eff_frontier_vector(m23,Cov23)
-	a13, b13 = op.eff_frontier_vector(m13,Cov13)
-
 	#Define The Axes:
 	fig, ax = plt.subplots()
 	ax.tick_params(direction='in',axis='both',which='major',bottom='True',left='True',right='True',top='True',length=9,width=0.75)
 	ax.tick_params(direction='in',axis='both',which='minor',bottom='True',left='True',right='True',top='True',length=6,width=0.75)
 	
-	n = len(mu_v)
-
-	sigma_v = []
-	sigma12_v = []
-	sigma23_v = []
-	sigma13_v = []
-
-	dim = len(m)
-	dimij = 2
-
-	#Compute the risk from the vectors:
-	for j in range(n):
-		w_eff2 = []
-		w12_eff2 = []
-		w23_eff2 = []
-		w13_eff2 = []
-		for k in range(dim):
-			temp = mu_v[j]*a[k] + b[k]
-			w_eff2.append(temp)
-
-		for l in range(2):
-			temp12 = mu_v[j]*a12[l] + b12[l]
-			temp23 = mu_v[j]*a23[l] + b23[l]
-			temp13 = mu_v[j]*a13[l] + b13[l]
-			w12_eff2.append(temp12)
-			w23_eff2.append(temp23)
-			w13_eff2.append(temp13)
-
-		mu2_v, sigma2_v = op.value(m,Cov,w_eff2)
-		mu12_v, sigma12_v2 = op.value(m12,Cov12,w12_eff2)
-		mu23_v, sigma23_v2 = op.value(m23,Cov23,w23_eff2)
-		mu13_v, sigma13_v2 = op.value(m13,Cov13,w13_eff2)
-		sigma_v.append(sigma2_v)
-		sigma12_v.append(sigma12_v2)
-		sigma23_v.append(sigma23_v2)
-		sigma13_v.append(sigma13_v2)
-	
-		del w_eff2
-		del w12_eff2
-		del w23_eff2
-		del w13_eff2
+	#Compute the risk along the minimum variance lines for all the expected returns at once:
+	w_eff2, mu2_v, sigma_v, ind = op.eff_frontier_batch(m,Cov,mu_v,weights=False)
+	w12_eff2, mu12_v, sigma12_v, ind = op.eff_frontier_batch(m12,Cov12,mu_v,weights=False)
+	w23_eff2, mu23_v, sigma23_v, ind = op.eff_frontier_batch(m23,Cov23,mu_v,weights=False)
+	w13_eff2, mu13_v, sigma13_v, ind = op.eff_frontier_batch(m13,Cov13,mu_v,weights=False)
 
 	ax.plot(sigma_v,mu_v,color='k',linewidth = 1.0, label='Markowitchz Line (total)')
 	ax.plot(sigma12_v,mu_v,color='r',linewidth = 0.85, label='Markowitchz Line (12)')
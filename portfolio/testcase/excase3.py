@@ -60,15 +60,6 @@ def excase3():
 	Cov23 = op.cov_construct(rho23,sigma23)
 	Cov13 = op.cov_construct(rho13,sigma13)
 
-	#Compute the vectors a and b associated with the minimum variance line:
-	a, b = op.eff_frontier_vector(m,Cov)
-
-	#Compute the vectors a and b associated with the minimum variance line of each pair pf security:
-	a12, b12 = op.eff_frontier_vector(m12,Cov12)
-	a23, b23 = op.eff_frontier_vector(m23,Cov23)
-	a13, b13 = op.eff_frontier_vector(m13,Cov13)
-
-
 	#Compute the weight associated with the Minimum Variance Portfolio:
 	w_mvp = op.mvp(Cov)
 	#Print the weight of MVP:
@@ -96,12 +87,6 @@ def excase3():
 	ax.tick_params(direction='in',axis='both',which='major',bottom='True',left='True',right='True',top='True',length=9,width=0.75)
 	ax.tick_params(direction='in',axis='both',which='minor',bottom='True',left='True',right='True',top='True',length=6,width=0.75)
 	
-	n = len(mu_v)
-
-	sigma_v = []
-	sigma12_v = []
-	sigma23_v = []
-	sigma13_v = []
 	sigmacomb_mp = np.arange(0,0.9,0.01)
 	dim2 = len(sigmacomb_mp)
 	mucomb_mp = []
@@ -110,56 +95,16 @@ def excase3():
 	for i in range(dim2):
 		mucomb_mp.append(cml(mu_mp,sigma_mp,R,sigmacomb_mp[i]))
 
-	dim = len(m)
-	dimij = 2
-
-	
-	#Compute the risk from the vectors:
-	for j in range(n):
-		w_eff2 = []
-		w12_eff2 = []
-		w23_eff2 = []
-		w13_eff2 = []
-		for k in range(dim):
-			temp = mu_v[j]*a[k] + b[k]
-			w_eff2.append(temp)
-
-		for l in range(2):
-			temp12 = mu_v[j]*a12[l] + b12[l]
-			temp23 = mu_v[j]*a23[l] + b23[l]
-			temp13 = mu_v[j]*a13[l] + b13[l]
-			w12_eff2.append(temp12)
-			w23_eff2.append(temp23)
-			w13_eff2.append(temp13)
-
-		mu2_v, sigma2_v = op.value(m,Cov,w_eff2)
-		mu12_v, sigma12_v2 = op.value(m12,Cov12,w12_eff2)
-		mu23_v, sigma23_v2 = op.value(m23,Cov23,w23_eff2)
-		mu13_v, sigma13_v2 = op.value(m13,Cov13,w13_eff2)
-		sigma_v.append(sigma2_v)
-		sigma12_v.append(sigma12_v2)
-		sigma23_v.append(sigma23_v2)
-		sigma13_v.append(sigma13_v2)
-	
-		del w_eff2
-		del w12_eff2
-		del w23_eff2
-		del w13_eff2
+	#Compute the risk along the minimum variance lines for all the expected returns at once:
+	w_eff2, mu2_v, sigma_v, ind = op.eff_frontier_batch(m,Cov,mu_v,weights=False)
+	w12_eff2, mu12_v, sigma12_v, ind = op.eff_frontier_batch(m12,Cov12,mu_v,weights=False)
+	w23_eff2, mu23_v, sigma23_v, ind = op.eff_frontier_batch(m23,Cov23,mu_v,weights=False)
 
 	#Find the maximum gradient of new CML associated with no short-selling:
-	max_grad_new_CML = 0
-	ind_max_CML = 0
-	for i in range(n):
-		temp = (mu_v[i] - R)/sigma13_v[i]
-		if temp > max_grad_new_CML:
-			max_grad_new_CML = temp
-			ind_max_CML = i
+	w13_eff2, mu13_v, sigma13_v, ind_max_CML = op.eff_frontier_batch(m13,Cov13,mu_v,R=R)
 
 	#Compute the weight associated with the Market Portfolio with the new CML line with no short-selling:
-	w_mp_new = []
-	dim3 = len(a13)
-	for i in range(dim3):
-		w_mp_new.append(a13[i]*mu_v[ind_max_CML]+b13[i])
+	w_mp_new = w13_eff2[ind_max_CML]
 	print("\n") 
 	#Print the weight associated with the new CML line with no short-selling:
 	print("Market Portfolio weight (no short-selling):",w_mp_new)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+import math
+import sys
+sys.path.append("..")
+from lib import option as op
+from lib import blackscholes as bs
+
+def exgreeks(N):
+	'''
+	Compare the sensitivities read off the binomial lattice with the Black-Scholes sensitivities for up and down
+	returns with the drift inside the exponent (the middle node at time step 2 differs from the initial price).
+	'''
+	X = 100
+	S = 100
+	r = 0.05
+	sigma = 0.2
+	T = 1
+	h = T/N
+
+	#Single step returns (not the CRR parameters, (1+U)(1+D) != 1):
+	R = math.exp(r*h) - 1
+	U, D = bs.return_h(0.3, sigma, T, N)
+
+	greek_lat = op.eu_option_binom_disc_level(R, float(U), float(D), S, X, N, greeks=True)[-1]
+	greek_bs = bs.eu_option_greeks(S, 0, T, r, sigma, X)
+
+	print("Sensitivities per time step with N = "+str(N))
+	for key in ('C_E', 'P_E'):
+		for name, scale in (('delta', 1), ('gamma', 1), ('theta', h)):
+			val = greek_lat[key][name]
+			ref = float(greek_bs[key][name])*scale
+			print(key, name, "lattice:", val, "black-scholes:", ref)
+			assert abs(val - ref) <= 1e-2*abs(ref), (key, name)
+
+
+if __name__ == "__main__":
+	N = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+	exgreeks(N)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+import sys
+sys.path.append("..")
+from lib import montecarlo as mc
+from lib import blackscholes as bs
+
+def exmc(sample_num):
+	'''
+	Price the European call and put options by Monte Carlo simulation with the default variance reduction
+	(antithetic variates and control variate) and compare with the Black-Scholes prices.
+	'''
+	X = 100
+	S = 100
+	r = 0.05
+	sigma = 0.2
+	t = 0
+	T = 1
+
+	C_E, P_E = bs.eu_option_bs(S, t, T, r, sigma, X)
+
+	print("European Options Price by Monte Carlo with "+str(sample_num)+" samples")
+	for call, ref in ((True, C_E), (False, P_E)):
+		V, se, ci, n = mc.eu_option_mc(S, t, T, r, sigma, X, call=call, sample_num=sample_num, seed=2026)
+		print("call:" if call else "put:", V, "se:", se, "ci:", ci, "black-scholes:", ref)
+		#The estimate must carry a genuine (non-zero) sampling error:
+		assert se > 0
+		assert abs(V - ref) <= 5*se
+
+
+if __name__ == "__main__":
+	sample_num = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+	exmc(sample_num)